@@ -1,21 +1,47 @@
-from flask import Flask, render_template, request
-import rdflib
+import hashlib
+import hmac
+import json
+import math
+import os
+
+import numpy as np
+from flask import Flask, Response, g, has_app_context, jsonify, render_template, request, stream_with_context
+from markupsafe import escape
+from werkzeug.local import LocalProxy
+
+from caches import PageCache, ResultCache
+from cards import build_card, remove_url_prefix, symbol_card
+from reloader import Reloader
+from unit_engine import BASE_UNITS, ConversionError
 
 app = Flask(__name__)
 
-# Load RDF graphs
-g = rdflib.Graph()
-g.parse("si.ttl", format="ttl")
-g.parse("quantities.ttl", format="ttl")
-g.parse("decisions.ttl", format="ttl")
-g.parse("constants.ttl", format="ttl")
-g.parse("units.ttl", format="ttl")
-g.parse("prefixes.ttl", format="ttl")
+# Load RDF graphs (from the compiled snapshot when the .ttl files are unchanged)
+# and build the search index and result cards; reloaded in the background
+# when the .ttl files change (see reloader.py)
+reloader = Reloader()
 
 
-def remove_url_prefix(uri):
-    """Helper function to clean URL prefixes for display."""
-    return uri.split('#')[-1] if '#' in uri else uri.split('/')[-1]
+@app.before_request
+def pin_dataset():
+    """Keep the Dataset current at the start of the request for all of it, even if a reload swaps it."""
+    g.dataset = reloader.dataset
+
+
+# The Dataset of the current request (the current one outside requests)
+dataset = LocalProxy(lambda: g.dataset if has_app_context() and 'dataset' in g else reloader.dataset)
+
+# /search cards and /resolution rows by input, dropped whenever the graph changes
+result_cache = ResultCache(max_entries=1024, max_bytes=8 * 1024 * 1024)
+
+# Final HTML (and gzip) of the result pages, rendered once per input and graph
+page_cache = PageCache(max_entries=512, max_bytes=32 * 1024 * 1024)
+
+# Serialized /api/v1 responses as (status, JSON bytes)
+api_cache = ResultCache(max_entries=2048, max_bytes=16 * 1024 * 1024, sizeof=lambda entry: len(entry[1]))
+
+# Largest number of terms accepted by /api/v1/search/batch
+MAX_BATCH_TERMS = 100_000
 
 
 @app.route('/')
@@ -23,82 +49,220 @@ def index():
     return render_template('index.html')
 
 
-@app.route('/search', methods=['POST'])
+def has_data(card):
+    """True if the card has at least one field filled in."""
+    return any(value is not None for value in card.values())
+
+
+def subject_card(subject):
+    """The /search card of a subject IRI, as if its local name had been searched."""
+    key = remove_url_prefix(subject).lower()
+    if key in dataset.cards:
+        return dataset.cards[key]
+    return build_card(dataset.search_index.search(key))
+
+
+def find_card(raw_input, lang=None):
+    """
+    Build the /search card for the stripped user input; lang (e.g. "fr")
+    limits the label matches, exact or accent-insensitive, to labels in that
+    language.  Symbols and the substring search are language-neutral.
+    """
+    si_unit = raw_input.lower()
+    if (si_unit in dataset.cards and has_data(dataset.cards[si_unit])
+            and (lang is None or dataset.folded_labels.subjects(raw_input, lang))):
+        # Precomputed card for a unit, prefix or constant (labels that never
+        # occur in the searched triples, like most @fr ones, have empty cards)
+        return dataset.cards[si_unit]
+    if factors := dataset.symbols.resolve(raw_input):
+        # Prefixed unit ("km", "µs") or explicit product ("kW·h", "kW h");
+        # symbols are case-sensitive, so they are resolved from the raw input
+        return symbol_card(factors)
+    if subjects := dataset.folded_labels.subjects(raw_input, lang):
+        # A label ignoring accents and case ("metre" -> "mètre"@fr)
+        return subject_card(subjects[0])
+    # Candidate triples from the trigram index; same matches as the old
+    # SPARQL CONTAINS filter without scanning the whole graph
+    return build_card(dataset.search_index.search(si_unit))
+
+
+def search_card(raw_input, lang=None):
+    """find_card() through the result cache."""
+    key = ('search', raw_input, lang or '')
+    card = result_cache.get(key, dataset.version)
+    if card is None:
+        card = find_card(raw_input, lang)
+        result_cache.put(key, card, dataset.version)
+    return card
+
+
+def subject_rows(iri):
+    """Predicate/object rows of iri through the result cache."""
+    data = result_cache.get(('resolution', iri), dataset.version)
+    if data is None:
+        data = dataset.subjects.get(iri)
+        result_cache.put(('resolution', iri), data, dataset.version)
+    return data
+
+
+def fuzzy_card(si_unit):
+    """
+    On a miss, the card of the closest label or symbol to si_unit (see
+    search_index.FuzzyIndex) as (card, corrected word, alternative words),
+    or (None, None, []) if nothing is close enough.
+    """
+    candidates = [word for word, _ in dataset.fuzzy.lookup(si_unit, limit=6)]
+    for i, word in enumerate(candidates):
+        card = search_card(word)
+        if has_data(card):
+            return card, word, candidates[:i] + candidates[i + 1:]
+    return None, None, []
+
+
+def certain_miss(raw_input, fuzzy=False):
+    """
+    True if raw_input can match nothing, going by the n-gram Bloom filter;
+    with fuzzy, enough trigrams may be missing for the typo-tolerant fallback.
+    Exact cards and unit symbols ("kW·h" is not a substring of anything) are
+    checked first.
+    """
+    si_unit = raw_input.lower()
+    if si_unit in dataset.cards or dataset.symbols.resolve(raw_input):
+        return False
+    # Each edit a fuzzy match tolerates changes at most three trigrams
+    allowed_missing = 3 * dataset.fuzzy.allowed_distance(si_unit) if fuzzy else 0
+    return dataset.ngram_filter.rejects(raw_input, allowed_missing)
+
+
+def render_search(raw_input, lang=None):
+    """Render results2.html for the stripped /search input."""
+    si_unit = raw_input.lower()
+    processed_results, corrected, alternatives = None, None, []
+
+    if not certain_miss(raw_input, fuzzy=True):
+        processed_results = search_card(raw_input, lang)
+
+        # Nothing matched: try the closest spelling before giving up
+        if not has_data(processed_results):
+            processed_results, corrected, alternatives = fuzzy_card(si_unit)
+            if processed_results is None:
+                dataset.ngram_filter.record_false_positive()
+
+    # If no data is found, return a message
+    if processed_results is None:
+        message = f"No information found for SI unit: {si_unit}"
+        return render_template('results2.html', si_unit=si_unit, results=None, message=message)
+
+    # Render the results
+    return render_template('results2.html', si_unit=si_unit, results=processed_results, message=None,
+                           corrected=corrected, alternatives=alternatives)
+
+
+def render_resolution(obj_value):
+    """Render resolution.html for the object IRI."""
+    # Precomputed predicate/object rows of the object
+    data = subject_rows(obj_value)
+
+    # Set the heading to the object's value
+    heading = f"Information about: {remove_url_prefix(obj_value)}"
+
+    # If no data is found, return a message
+    if not data:
+        heading = f"No information found for {remove_url_prefix(obj_value)}"
+        return render_template('resolution.html', heading=heading, data=[])
+
+    # Render the resolution.html template with the data
+    return render_template('resolution.html', heading=heading, data=data)
+
+
+def render_quantity_details(obj_value):
+    """Render quantity_details.html for the quantity IRI."""
+    # Precomputed predicate/object rows of the quantity
+    data = dataset.subjects.get(obj_value)
+
+    # Set the heading to the Quantity object value
+    heading = f"Details about Quantity: {remove_url_prefix(obj_value)}"
+
+    # If no data is found
+    if not data:
+        heading = f"No details found for {remove_url_prefix(obj_value)}"
+        return render_template('quantity_details.html', heading=heading, data=[])
+
+    # Render the template with the data
+    return render_template('quantity_details.html', heading=heading, data=data)
+
+
+def page_etag(key, gzipped):
+    """Strong ETag of the page for key under the loaded graph (one per content encoding)."""
+    digest = hashlib.sha256("\0".join([dataset.version or "", *key]).encode("utf-8")).hexdigest()[:32]
+    return f"{digest}-gzip" if gzipped else digest
+
+
+def cached_page(key, render):
+    """
+    Serve the page for key from the page cache, rendering it with render()
+    on a miss; gzip-compressed when the client accepts it.
+    Conditional GETs that match the ETag or Last-Modified get a 304 before
+    any lookup or rendering.
+    """
+    accepts_gzip = bool(request.accept_encodings['gzip'])
+    response = Response(mimetype='text/html')
+    response.set_etag(page_etag(key, accepts_gzip))
+    response.last_modified = dataset.last_modified
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+
+    page = page_cache.get_or_render(key, dataset.version, render)
+    if accepts_gzip and page.gzipped is not None:
+        response.set_data(page.gzipped)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response.set_data(page.body)
+    return response
+
+
+def requested_lang():
+    """The ?lang= (or form lang) label language in lower case, or None."""
+    return request.values.get('lang', '').strip().lower() or None
+
+
+def unknown_lang(lang):
+    """True if lang is given but no label has that language tag."""
+    return lang is not None and lang not in dataset.folded_labels.languages
+
+
+@app.route('/search', methods=['GET', 'POST'])
 def search():
-    si_unit = request.form.get('si_unit', '').strip().lower()
+    # GET /search?q= (cacheable) or the form POST with si_unit
+    if request.method == 'GET':
+        raw_input = request.args.get('q', '').strip()
+    else:
+        raw_input = request.form.get('si_unit', '').strip()
+    # Optional label language, e.g. lang=fr
+    lang = requested_lang()
+    if unknown_lang(lang):
+        return f"Unknown language: {escape(lang)}", 400
 
     try:
-        # SPARQL query to fetch relevant data
-        query = f"""
-        SELECT ?subj ?pred ?obj
-        WHERE {{
-            ?subj ?pred ?obj .
-            FILTER(
-                CONTAINS(LCASE(STR(?subj)), "{si_unit}") || 
-                CONTAINS(LCASE(STR(?obj)), "{si_unit}")
-            ) .
-            FILTER (?pred IN (
-                <https://si-digital-framework.org/SI#hasSymbol>,
-                <https://si-digital-framework.org/SI#hasQuantity>,
-                <https://si-digital-framework.org/SI#hasDefiningConstant>,
-                <https://si-digital-framework.org/SI#hasDefiningResolution>,
-                <https://si-digital-framework.org/SI#hasUnitTypeAsString>,
-                <https://si-digital-framework.org/SI#hasUnit>,
-                <https://si-digital-framework.org/SI#hasDefiningEquation>
-            ))
-        }}
-        """
-        
-        # Execute the query on the graph
-        results = g.query(query)
-
-        # Initialize the processed results dictionary
-        processed_results = {
-            "Unit": None,
-            "Symbol": None,
-            "Quantity": None,
-            "Defining Constant": None,
-            "Defining Resolution": None,
-            "Unit Type": None,
-            "Defining Equation": None
-        }
-
-        # Process the query results
-        for result in results:
-            subj = str(result[0])
-            pred = str(result[1])
-            obj = str(result[2])
-
-            if "hasSymbol" in pred:
-                processed_results["Symbol"] = remove_url_prefix(obj)
-            elif "hasQuantity" in pred:
-                processed_results["Quantity"] = remove_url_prefix(obj)
-            elif "hasDefiningConstant" in pred:
-                # Link to the /resolution page with query parameter
-                processed_results["Defining Constant"] = f'<a href="/resolution?value={obj}" target="_blank">{remove_url_prefix(obj)}</a>'
-            elif "hasDefiningResolution" in pred:
-                # Link to the /resolution page with query parameter
-                processed_results["Defining Resolution"] = f'<a href="/resolution?value={obj}" target="_blank">{remove_url_prefix(obj)}</a>'
-            elif "hasUnitTypeAsString" in pred:
-                processed_results["Unit Type"] = remove_url_prefix(obj)
-            elif "hasUnit" in pred:
-                processed_results["Unit"] = remove_url_prefix(obj)
-            elif "hasDefiningEquation" in pred:
-                processed_results["Defining Equation"] = obj.strip()  # Keep as plain text for MathJax rendering
-
-        # If no data is found, return a message
-        if all(value is None for value in processed_results.values()):
-            message = f"No information found for SI unit: {si_unit}"
-            return render_template('results2.html', si_unit=si_unit, results=None, message=message)
-
-        # Render the results
-        return render_template('results2.html', si_unit=si_unit, results=processed_results, message=None)
+        return cached_page(('search', raw_input, lang or ''), lambda: render_search(raw_input, lang))
 
     except Exception as e:
         print(f"Error during query execution: {e}")
         return f"An error occurred: {e}"
 
 
+@app.route('/suggest')
+def suggest():
+    """Autocomplete for the search box: labels and symbols starting with ?q= (at most ?limit=, up to 50)."""
+    prefix = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    return jsonify(dataset.suggestions.complete(prefix, limit))
+
+
 @app.route('/resolution')
 def resolution():
     """Route to display information about the selected value (object)."""
@@ -109,35 +273,292 @@ def resolution():
         return render_template('resolution.html', heading="No Value Provided", data=[])
 
     try:
-        # SPARQL query to fetch information about the object from constants.ttl
-        query = f"""
-        SELECT ?pred ?obj
-        WHERE {{
-            <{obj_value}> ?pred ?obj .
-        }}
-        """
-        results = g.query(query)
+        return cached_page(('resolution', obj_value), lambda: render_resolution(obj_value))
 
-        # Process the query results into a list of dictionaries
-        data = [{"Predicate": remove_url_prefix(str(row[0])), "Object": remove_url_prefix(str(row[1]))} for row in results]
+    except Exception as e:
+        print(f"Error querying RDF data: {e}")
+        return render_template('resolution.html', heading="Error Occurred", data=[])
 
-        # Set the heading to the object's value
-        heading = f"Information about: {remove_url_prefix(obj_value)}"
 
-        # If no data is found, return a message
-        if not data:
-            heading = f"No information found for {remove_url_prefix(obj_value)}"
-            return render_template('resolution.html', heading=heading, data=[])
+@app.route('/quantity_details')
+def quantity_details():
+    """Route to display detailed information about the Quantity."""
+    obj_value = request.args.get('value', '').strip()
 
-        # Render the resolution.html template with the data
-        return render_template('resolution.html', heading=heading, data=data)
+    if not obj_value:
+        return render_template('quantity_details.html', heading="No Quantity Provided", data=[])
+
+    return cached_page(('quantity_details', obj_value), lambda: render_quantity_details(obj_value))
+
+
+def requested_fields():
+    """The comma-separated ?fields= selection, or None for all fields."""
+    fields = tuple(field.strip() for field in request.args.get('fields', '').split(',') if field.strip())
+    return fields or None
+
+
+def select_fields(card, fields):
+    return card if fields is None else {field: card[field] for field in fields if field in card}
+
+
+def search_payload(raw_input, fields, lang=None):
+    """(status, payload) of the /search card for raw_input, as the JSON API returns it."""
+    card = None if certain_miss(raw_input) else search_card(raw_input, lang)
+    if card is None or not has_data(card):
+        if card is not None:
+            dataset.ngram_filter.record_false_positive()
+        return 404, {"error": f"No information found for SI unit: {raw_input.lower()}"}
+    return 200, select_fields(card, fields)
+
+
+def api_response(key, build):
+    """
+    Serve the JSON body for key from the API cache, calling build() ->
+    (status, payload) and serializing it on a miss.
+    """
+    entry = api_cache.get(key, dataset.version)
+    if entry is None:
+        status, payload = build()
+        entry = status, json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        api_cache.put(key, entry, dataset.version)
+    status, body = entry
+    return Response(body, status=status, mimetype='application/json')
+
+
+@app.route('/api/v1/search')
+def api_search():
+    """The /search card for ?q= (and ?lang=) as JSON; ?fields=Unit,Symbol selects card fields."""
+    raw_input = request.args.get('q', '').strip()
+    if not raw_input:
+        return jsonify(error="Expected a non-empty 'q' parameter"), 400
+    fields = requested_fields()
+    lang = requested_lang()
+    if unknown_lang(lang):
+        return jsonify(error=f"Unknown language: {lang}"), 400
+    return api_response(('search', raw_input, fields, lang), lambda: search_payload(raw_input, fields, lang))
+
+
+@app.route('/api/v1/search/batch', methods=['POST'])
+def api_search_batch():
+    """
+    Look up many terms at once: a JSON body {"terms": [...]} (or a bare list),
+    answered as NDJSON with one line per term in input order:
+    {"term": ..., "status": 200, "card": {...}} or {"term": ..., "status": 404, "error": ...}.
+    Repeated terms are looked up once; ?fields= works as for /api/v1/search.
+    """
+    body = request.get_json(silent=True)
+    terms = body.get('terms') if isinstance(body, dict) else body
+    if not isinstance(terms, list) or not all(isinstance(term, str) for term in terms):
+        return jsonify(error="Expected a JSON list of strings, or {\"terms\": [...]}"), 400
+    if len(terms) > MAX_BATCH_TERMS:
+        return jsonify(error=f"At most {MAX_BATCH_TERMS} terms per batch"), 413
+    fields = requested_fields()
+
+    def lines():
+        seen = {}
+        for term in terms:
+            term = term.strip()
+            line = seen.get(term)
+            if line is None:
+                if not term:
+                    status, payload = 400, {"error": "Empty term"}
+                else:
+                    status, payload = search_payload(term, fields)
+                result = {"card": payload} if status == 200 else payload
+                line = seen[term] = json.dumps({"term": term, "status": status, **result},
+                                               ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+            yield line
+
+    return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/v1/units/<unit_id>')
+def api_unit(unit_id):
+    """
+    The card of one unit, prefix or constant, by local name, label or symbol
+    (e.g. "metre", "kilogram", "km"); unlike /api/v1/search there is no
+    substring matching.
+    """
+    fields = requested_fields()
+
+    def build():
+        key = unit_id.lower()
+        card = dataset.cards[key] if key in dataset.cards else None
+        if card is None or not has_data(card):
+            if factors := dataset.symbols.resolve(unit_id):
+                card = symbol_card(factors)
+            elif subjects := dataset.folded_labels.subjects(unit_id):
+                # Labels with an empty card of their own ("ampère", "degree celsius")
+                card = subject_card(subjects[0])
+        if card is None or not has_data(card):
+            return 404, {"error": f"Unknown unit: {unit_id}"}
+        return 200, select_fields(card, fields)
+
+    return api_response(('units', unit_id, fields), build)
+
+
+@app.route('/api/v1/resource')
+def api_resource():
+    """
+    The /resolution rows of ?iri= as JSON; ?fields=hasSymbol,prefLabel keeps
+    only the rows with those predicates.
+    """
+    iri = request.args.get('iri', '').strip()
+    if not iri:
+        return jsonify(error="Expected a non-empty 'iri' parameter"), 400
+    fields = requested_fields()
+
+    def build():
+        rows = subject_rows(iri)
+        if not rows:
+            return 404, {"error": f"No information found for {remove_url_prefix(iri)}"}
+        if fields is not None:
+            rows = [row for row in rows if row["Predicate"] in fields]
+        return 200, {"iri": iri, "rows": rows}
+
+    return api_response(('resource', iri, fields), build)
+
+
+@app.route('/convert')
+def convert():
+    """Convert ?value= from the unit ?from= to the unit ?to= (symbols or names)."""
+    value = request.args.get('value', type=float)
+    from_unit = request.args.get('from', '').strip()
+    to_unit = request.args.get('to', '').strip()
+
+    if value is None or not math.isfinite(value) or not from_unit or not to_unit:
+        return jsonify(error="Expected a finite numeric 'value' and non-empty 'from' and 'to' parameters"), 400
 
-    except Exception as e:
-        print(f"Error querying RDF data: {e}")
-        return render_template('resolution.html', heading="Error Occurred", data=[])
+    try:
+        result = dataset.conversions.convert(value, from_unit, to_unit)
+    except ConversionError as e:
+        return jsonify(error=str(e)), 400
+    # JSON has no NaN or Infinity
+    if not math.isfinite(result):
+        return jsonify(error="The result is out of the float64 range"), 400
+
+    return jsonify({"value": value, "from": from_unit, "to": to_unit, "result": result})
+
+
+@app.route('/api/convert/batch', methods=['POST'])
+def convert_batch():
+    """
+    Convert many values at once.
+    Either a JSON body {"values": [...], "from": ..., "to": ...}, or a raw
+    little-endian float64 body (Content-Type: application/octet-stream) with
+    ?from= and ?to= in the query string, answered in the same format.
+    JSON values must be finite numbers (JSON has no NaN or Infinity); the
+    binary format carries any float64.
+    """
+    binary = request.mimetype == 'application/octet-stream'
+    if binary:
+        payload = request.get_data()
+        from_unit = request.args.get('from', '').strip()
+        to_unit = request.args.get('to', '').strip()
+        if len(payload) % 8:
+            return jsonify(error="Binary body must be a whole number of float64 values"), 400
+        values = np.frombuffer(payload, dtype='<f8')
+    else:
+        body = request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            return jsonify(error="Expected a JSON object with 'values', 'from' and 'to'"), 400
+        from_unit = str(body.get('from', '')).strip()
+        to_unit = str(body.get('to', '')).strip()
+        raw_values = body.get('values', [])
+        # numpy would take true/false as 1/0
+        if not isinstance(raw_values, list) or any(isinstance(v, bool) for v in raw_values):
+            return jsonify(error="'values' must be a list of numbers"), 400
+        try:
+            values = np.asarray(raw_values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return jsonify(error="'values' must be a list of numbers"), 400
+        if values.ndim != 1:
+            return jsonify(error="'values' must be a flat list of numbers"), 400
+        # Python's JSON parser accepts NaN and Infinity
+        if not np.isfinite(values).all():
+            return jsonify(error="'values' must be finite numbers"), 400
+
+    if not from_unit or not to_unit:
+        return jsonify(error="Expected non-empty 'from' and 'to' units"), 400
+
+    try:
+        result = dataset.conversions.convert_array(values, from_unit, to_unit)
+    except ConversionError as e:
+        return jsonify(error=str(e)), 400
+
+    if binary:
+        return Response(result.astype('<f8', copy=False).tobytes(), mimetype='application/octet-stream')
+    if not np.isfinite(result).all():
+        return jsonify(error="A result is out of the float64 range"), 400
+    return jsonify({"from": from_unit, "to": to_unit, "values": result.tolist()})
+
+
+@app.route('/dimension')
+def dimension():
+    """List the units and constants with the same dimension as ?unit= (e.g. "J/K")."""
+    unit = request.args.get('unit', '').strip()
+    if not unit:
+        return jsonify(error="Expected a non-empty 'unit' parameter"), 400
+
+    try:
+        vector = dataset.conversions.lookup(unit).dimension
+    except ConversionError as e:
+        return jsonify(error=str(e)), 400
+
+    return jsonify({
+        "unit": unit,
+        "dimension": {remove_url_prefix(base): exponent for base, exponent in zip(BASE_UNITS, vector)},
+        "units": [remove_url_prefix(u) for u in dataset.dimensions.units_by_dimension.get(vector, [])],
+        "constants": [remove_url_prefix(c) for c in dataset.dimensions.constants_by_dimension.get(vector, [])],
+    })
+
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    """Hit/miss/eviction counters and occupancy of the result, page and API caches."""
+    return jsonify(results=result_cache.stats(), pages=page_cache.stats(), api=api_cache.stats())
+
+
+@app.route('/api/search/filter/stats')
+def search_filter_stats():
+    """Size, fill ratio and estimated and observed false-positive rates of the n-gram Bloom filter."""
+    return jsonify(dataset.ngram_filter.stats())
+
+
+def admin_allowed():
+    """
+    True for requests with the SI_ADMIN_TOKEN bearer token.  Without a token
+    the admin endpoints are closed: behind a reverse proxy on the same host
+    every client would look like a local one.
+    """
+    token = os.environ.get('SI_ADMIN_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+@app.route('/api/admin/reload', methods=['GET', 'POST'])
+def admin_reload():
+    """
+    GET: version of the loaded data and result of the last reload.
+    POST: reload the .ttl files in the background (?force=1 even if they
+    are unchanged); 202 if a reload was started, 409 if one is running.
+    Under gunicorn with preload_app the master reloads, always in full, and
+    replaces the workers (see gunicorn.conf.py).
+    """
+    if not admin_allowed():
+        return jsonify(error="Forbidden"), 403
+    if request.method == 'GET':
+        return jsonify(reloader.status())
+    started = reloader.reload(force=request.args.get('force') == '1')
+    return jsonify(reloader.status()), 202 if started else 409
 
 
 if __name__ == "__main__":
+    reloader.install_signal_handler()
+    reloader.watch()
     app.run(debug=False)  
 
 
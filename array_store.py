@@ -0,0 +1,205 @@
+"""
+Read-only rdflib store for the SI graph.
+
+rdflib's Memory store keeps nested dicts of full term objects for its
+SPO/POS/OSP indexes.  The SI graph never changes after loading, so this store
+interns every term to an int once and keeps each index as a sorted flat
+integer array, answering triples() by binary search.
+
+The indexes can also be any other sequence of packed keys, such as the
+memoryviews graph_loader.read_snapshot maps from a snapshot file: every
+process that opens the same snapshot then shares one copy of them in the
+page cache, and attaching costs no parsing or sorting.
+
+The store plugs in behind the normal rdflib.Graph API:
+
+    g = rdflib.Graph(store=ArrayStore(terms, triples))
+    g = rdflib.Graph(store="SIArray"); g.open("si_graph.bin")
+"""
+from array import array
+from bisect import bisect_left
+
+from rdflib import plugin
+from rdflib.graph import ModificationException
+from rdflib.store import VALID_STORE, Store
+
+# Each index entry packs three term ids into one unsigned 64-bit key,
+# 21 bits per id, so a prefix of the key is a contiguous range of the array.
+ID_BITS = 21
+MAX_TERMS = 1 << ID_BITS
+ID_MASK = MAX_TERMS - 1
+
+
+def _pack(a, b, c):
+    return (a << (2 * ID_BITS)) | (b << ID_BITS) | c
+
+
+def _unpack(key):
+    return key >> (2 * ID_BITS), (key >> ID_BITS) & ID_MASK, key & ID_MASK
+
+
+def _sorted_keys(triples, order):
+    """Build a sorted array('Q') of packed keys for one permutation of the triples."""
+    x, y, z = order
+    keys = sorted(
+        _pack(triples[i + x], triples[i + y], triples[i + z])
+        for i in range(0, len(triples), 3)
+    )
+    return array("Q", keys)
+
+
+def build_indexes(triples):
+    """The (spo, pos, osp) sorted key arrays of a flat triple id array, without duplicates."""
+    spo = array("Q", dict.fromkeys(_sorted_keys(triples, (0, 1, 2))))
+    unique = array("I", (term_id for key in spo for term_id in _unpack(key)))
+    return spo, _sorted_keys(unique, (1, 2, 0)), _sorted_keys(unique, (2, 0, 1))
+
+
+class ArrayStore(Store):
+    """Immutable triple store over interned terms and sorted integer indexes."""
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, terms=None, triples=None, namespaces=(), configuration=None, identifier=None,
+                 indexes=None):
+        """
+        Either triples (a flat array of term ids) or indexes (the spo, pos
+        and osp keys, as build_indexes returns them) must come with terms.
+        """
+        self._terms = []
+        self._ids = {}
+        self._spo = self._pos = self._osp = array("Q")
+        self._namespaces = {}
+        self._prefixes = {}
+        for prefix, namespace in namespaces:
+            self.bind(prefix, namespace)
+        if terms is not None:
+            self._load(terms, build_indexes(triples) if indexes is None else indexes)
+        super().__init__(configuration, identifier)
+
+    def open(self, configuration, create=False):
+        """Load the store from a compiled graph snapshot file."""
+        from graph_loader import read_snapshot
+
+        snapshot = read_snapshot(configuration)
+        if snapshot is None:
+            raise ValueError(f"Not a valid graph snapshot: {configuration}")
+        namespaces, terms, indexes = snapshot
+        for prefix, namespace in namespaces:
+            self.bind(prefix, namespace)
+        self._load(terms, indexes)
+        return VALID_STORE
+
+    def _load(self, terms, indexes):
+        if len(terms) > MAX_TERMS:
+            raise ValueError(f"ArrayStore supports at most {MAX_TERMS} terms, got {len(terms)}")
+        self._terms = list(terms)
+        self._ids = {term: i for i, term in enumerate(self._terms)}
+        self._spo, self._pos, self._osp = indexes
+
+    def _range(self, index, prefix, depth):
+        """Yield the keys of index whose first `depth` ids equal those packed in prefix."""
+        width = 1 << (ID_BITS * (3 - depth))
+        start = bisect_left(index, prefix)
+        end = bisect_left(index, prefix + width, lo=start)
+        for i in range(start, end):
+            yield index[i]
+
+    def triples(self, triple_pattern, context=None):
+        """A generator over all the triples matching the pattern."""
+        ids = self._ids
+        pattern_ids = []
+        for term in triple_pattern:
+            if term is None:
+                pattern_ids.append(None)
+                continue
+            term_id = ids.get(term)
+            if term_id is None:
+                return
+            pattern_ids.append(term_id)
+        s, p, o = pattern_ids
+
+        if s is not None:
+            if p is not None:
+                if o is not None:
+                    matches = self._range(self._spo, _pack(s, p, o), 3)
+                else:
+                    matches = self._range(self._spo, _pack(s, p, 0), 2)
+            elif o is not None:
+                matches = self._osp_to_spo(self._range(self._osp, _pack(o, s, 0), 2))
+            else:
+                matches = self._range(self._spo, _pack(s, 0, 0), 1)
+        elif p is not None:
+            depth = 2 if o is not None else 1
+            matches = self._pos_to_spo(self._range(self._pos, _pack(p, o or 0, 0), depth))
+        elif o is not None:
+            matches = self._osp_to_spo(self._range(self._osp, _pack(o, 0, 0), 1))
+        else:
+            matches = iter(self._spo)
+
+        terms = self._terms
+        for key in matches:
+            si, pi, oi = _unpack(key)
+            yield (terms[si], terms[pi], terms[oi]), iter(())
+
+    @staticmethod
+    def _pos_to_spo(keys):
+        for key in keys:
+            p, o, s = _unpack(key)
+            yield _pack(s, p, o)
+
+    @staticmethod
+    def _osp_to_spo(keys):
+        for key in keys:
+            o, s, p = _unpack(key)
+            yield _pack(s, p, o)
+
+    def __len__(self, context=None):
+        return len(self._spo)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def add(self, triple, context=None, quoted=False):
+        raise ModificationException()
+
+    def addN(self, quads):
+        raise ModificationException()
+
+    def remove(self, triple, context=None):
+        raise ModificationException()
+
+    # Namespace bindings are metadata, not triples, so they stay writable
+    # (same rules as rdflib's Memory store)
+    def bind(self, prefix, namespace, override=True):
+        bound_namespace = self._namespaces.get(prefix)
+        bound_prefix = self._prefixes.get(namespace)
+        if bound_prefix is None and bound_namespace is not None:
+            bound_prefix = self._prefixes.get(bound_namespace)
+        if override:
+            if bound_prefix is not None:
+                del self._namespaces[bound_prefix]
+            if bound_namespace is not None:
+                del self._prefixes[bound_namespace]
+            self._prefixes[namespace] = prefix
+            self._namespaces[prefix] = namespace
+        else:
+            self._prefixes[bound_namespace if bound_namespace is not None else namespace] = (
+                bound_prefix if bound_prefix is not None else prefix)
+            self._namespaces[bound_prefix if bound_prefix is not None else prefix] = (
+                bound_namespace if bound_namespace is not None else namespace)
+
+    def namespace(self, prefix):
+        return self._namespaces.get(prefix)
+
+    def prefix(self, namespace):
+        return self._prefixes.get(namespace)
+
+    def namespaces(self):
+        yield from self._namespaces.items()
+
+
+plugin.register("SIArray", Store, "array_store", "ArrayStore")
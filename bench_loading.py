@@ -0,0 +1,63 @@
+"""
+Compare wall-clock time to parse and intern the Turtle files sequentially
+(one rdflib graph, as the app used to) with parse_sources_parallel, without
+and with the deduplication of repeated subject blocks, as the number of
+files and their size grow.
+
+Larger inputs are made by repeating the body of each file `scale` times
+(the repeated triples are merged away again; without deduplication all of
+them are parsed).
+
+    python bench_loading.py [repeat] [workers]
+"""
+import os
+import sys
+import tempfile
+
+from bench_utils import best_ms
+from graph_loader import TTL_FILES, default_workers, intern_graph, parse_sources, parse_sources_parallel
+
+FILE_COUNTS = [1, 2, 4, 6]
+SCALES = [1, 4, 16]
+
+
+def _scaled_copies(directory, paths, scale):
+    """Write each file with its content repeated scale times; return the new paths."""
+    copies = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        copy = os.path.join(directory, f"x{scale}_{os.path.basename(path)}")
+        with open(copy, "w", encoding="utf-8") as f:
+            f.write("\n".join([text] * scale))
+        copies.append(copy)
+    return copies
+
+
+def _sequential(paths):
+    return intern_graph(parse_sources(paths))
+
+
+def main(repeat=3, workers=None):
+    print(f"best of {repeat} runs, milliseconds to parse and intern")
+    print(f"{'files':>5} {'scale':>5} {'KiB':>8} {'triples':>8} {'sequential':>11} {'parallel':>10} "
+          f"{'speedup':>8} {'deduped':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in SCALES:
+            scaled = _scaled_copies(directory, TTL_FILES, scale)
+            for count in FILE_COUNTS:
+                paths = scaled[:count]
+                # A script may spawn its pool; the app only forks one by default
+                n = workers or default_workers(paths)
+                size = sum(os.path.getsize(path) for path in paths) // 1024
+                triples = len(parse_sources_parallel(paths, n, dedupe=False)[2]) // 3
+                old = best_ms(repeat, lambda: _sequential(paths))
+                new = best_ms(repeat, lambda: parse_sources_parallel(paths, n, dedupe=False))
+                deduped = best_ms(repeat, lambda: parse_sources_parallel(paths, n))
+                print(f"{count:5d} {scale:5d} {size:8d} {triples:8d} {old:11.1f} {new:10.1f} {old / new:7.2f}x "
+                      f"{deduped:10.1f} {old / deduped:7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
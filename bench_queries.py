@@ -0,0 +1,52 @@
+"""
+Compare per-request cost of the old f-string SPARQL queries with the
+prepared queries in queries.py.
+
+    python bench_queries.py [repeat]
+"""
+import sys
+
+from rdflib import URIRef
+from rdflib.plugins.sparql.processor import prepareQuery
+
+from bench_utils import best_ms
+from graph_loader import load_graph
+from queries import QUERY_TEXT, run_query
+
+NEEDLES = ["metre", "kg", "second", "ampere", "kelvin", "mole", "candela", "planck"]
+SUBJECTS = [
+    "https://si-digital-framework.org/constants/PlanckConstant",
+    "https://si-digital-framework.org/constants/SpeedOfLightInVacuum",
+    "https://si-digital-framework.org/SI/units/metre",
+]
+
+
+def _fstring(name, value):
+    """The query text the routes used to build, with value pasted in."""
+    if name == "search":
+        return QUERY_TEXT[name].replace("?needle", f'"{value}"')
+    return QUERY_TEXT[name].replace("?subject", f"<{value}>")
+
+
+def main(repeat=5):
+    g = load_graph()
+    cases = {
+        "search": [(needle, {"needle": needle}) for needle in NEEDLES],
+        "resolution": [(iri, {"subject": URIRef(iri)}) for iri in SUBJECTS],
+    }
+
+    print(f"best of {repeat} runs, milliseconds per query")
+    print(f"{'query':<12} {'parse':>10} {'f-string':>10} {'prepared':>10}")
+    for name, values in cases.items():
+        parse = old = new = 0.0
+        for value, bindings in values:
+            text = _fstring(name, value)
+            parse += best_ms(repeat, lambda: prepareQuery(text))
+            old += best_ms(repeat, lambda: list(g.query(text)))
+            new += best_ms(repeat, lambda: list(run_query(g, name, **bindings)))
+        n = len(values)
+        print(f"{name:<12} {parse / n:10.3f} {old / n:10.3f} {new / n:10.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
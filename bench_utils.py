@@ -0,0 +1,12 @@
+"""Timing helper shared by the bench_*.py scripts."""
+import time
+
+
+def best_ms(repeat, fn):
+    """Best wall time of fn over repeat runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
@@ -0,0 +1,237 @@
+"""
+In-process caches for route results.
+
+ResultCache is an LRU cache bounded by entry count and by (approximate) bytes,
+with TinyLFU admission: a new entry only displaces the least recently used
+one if it has been requested more often, as counted by a small count-min
+sketch.  A burst of one-off inputs (typos, random strings) therefore cannot
+push out the units everybody looks up.
+
+Every entry belongs to one graph version.  A lookup with another version
+drops the whole cache in the same locked step, and results computed for any
+version but the current one are not stored, so a reload can never serve
+results computed from the previous graph.
+
+PageCache keeps fully rendered pages (and their gzip form) in a ResultCache
+and renders each missing page only once however many requests ask for it
+at the same time.
+"""
+import gzip
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+
+def deep_sizeof(value):
+    """Approximate memory footprint of value and the containers/strings it holds."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item) for item in value)
+    return size
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent request frequencies (4 rows, counters capped at 15).
+    All counters are halved every sample_size increments so that the counts
+    follow current traffic rather than all-time totals.
+    """
+
+    MAX_COUNT = 15
+    # Odd multipliers, one per row, that spread hash(key) differently per row
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+
+    def __init__(self, capacity):
+        width = 16
+        while width < 4 * capacity:
+            width *= 2
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in self.SEEDS]
+        self.sample_size = 10 * max(capacity, 1)
+        self._additions = 0
+
+    def _indexes(self, key):
+        h = hash(key)
+        return [((h * seed) >> 32) & self._mask for seed in self.SEEDS]
+
+    def increment(self, key):
+        for row, i in zip(self._rows, self._indexes(key)):
+            if row[i] < self.MAX_COUNT:
+                row[i] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._reset()
+
+    def estimate(self, key):
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def _reset(self):
+        for row in self._rows:
+            for i, count in enumerate(row):
+                if count:
+                    row[i] = count >> 1
+        self._additions //= 2
+
+
+class ResultCache:
+    """Thread-safe LRU cache with TinyLFU admission and graph-version invalidation."""
+
+    def __init__(self, max_entries=1024, max_bytes=8 * 1024 * 1024, sizeof=deep_sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._sketch = FrequencySketch(max_entries)
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.rejections = self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached value for key under version, or None."""
+        with self._lock:
+            self._check_version(version)
+            self._sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, version):
+        """
+        Offer value for key.  It is stored unless it was computed for another
+        graph version, is larger than the whole cache, or making room would
+        evict an entry requested more often.
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            if version != self._version:
+                return False
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                self.rejections += 1
+                return False
+
+            victims = []
+            count, used = len(self._entries), self._bytes
+            frequency = self._sketch.estimate(key)
+            for victim in self._entries:
+                if count < self.max_entries and used + size <= self.max_bytes:
+                    break
+                if self._sketch.estimate(victim) >= frequency:
+                    self.rejections += 1
+                    return False
+                victims.append(victim)
+                count -= 1
+                used -= self._entries[victim][1]
+
+            for victim in victims:
+                self._bytes -= self._entries.pop(victim)[1]
+            self.evictions += len(victims)
+            self._entries[key] = (value, size)
+            self._bytes += size
+            return True
+
+    def stats(self):
+        """Counters and current occupancy, for the stats endpoint."""
+        with self._lock:
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejections": self.rejections,
+                "invalidations": self.invalidations,
+            }
+
+
+# Final bytes of a rendered page; gzipped is None for pages too small to compress
+RenderedPage = namedtuple("RenderedPage", ["body", "gzipped"])
+
+
+class _Flight:
+    """One in-progress render that concurrent requests for the same page wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.page = None
+        self.error = None
+
+
+class PageCache:
+    """
+    Rendered pages by key, with single-flight rendering: when several requests
+    miss on the same key at once, the first renders the page and the others
+    wait for and share its result (or its exception).
+    """
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024, gzip_min_size=1024):
+        self.gzip_min_size = gzip_min_size
+        self._pages = ResultCache(max_entries, max_bytes,
+                                  sizeof=lambda page: len(page.body) + len(page.gzipped or b""))
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _encode(self, html):
+        body = html.encode("utf-8")
+        gzipped = gzip.compress(body, compresslevel=6) if len(body) >= self.gzip_min_size else None
+        return RenderedPage(body, gzipped)
+
+    def get_or_render(self, key, version, render):
+        """Return the RenderedPage for key, calling render() -> str on a miss."""
+        page = self._pages.get(key, version)
+        if page is not None:
+            return page
+
+        with self._lock:
+            flight = self._flights.get((version, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(version, key)] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.page
+
+        try:
+            flight.page = self._encode(render())
+            self._pages.put(key, flight.page, version)
+            return flight.page
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[(version, key)]
+            flight.done.set()
+
+    def stats(self):
+        """ResultCache counters plus the number of requests that waited on another's render."""
+        stats = self._pages.stats()
+        with self._lock:
+            stats["coalesced"] = self.coalesced
+            stats["in_flight"] = len(self._flights)
+        return stats
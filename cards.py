@@ -0,0 +1,205 @@
+"""
+Display data for the result pages: the /search cards and the
+predicate/object rows of /resolution and /quantity_details.
+"""
+from collections import defaultdict
+
+from rdflib import RDF, RDFS, Literal, URIRef
+from rdflib.namespace import SKOS
+
+from search_index import SI
+
+# Properties read by LabelIndex, most preferred first
+LABEL_PROPERTIES = [
+    RDFS.label,
+    SKOS.prefLabel,
+]
+
+# Subjects that get a precomputed card
+CARD_CLASSES = [
+    URIRef(SI + "SIBaseUnit"),
+    URIRef(SI + "SISpecialNamedUnit"),
+    URIRef(SI + "nonSIUnit"),
+    URIRef(SI + "MeasurementUnit"),
+    URIRef(SI + "PrefixedUnit"),
+    URIRef(SI + "SIPrefix"),
+    URIRef(SI + "Constant"),
+]
+
+# Properties whose values are accepted as lookup forms for a subject
+LOOKUP_PROPERTIES = [
+    SKOS.prefLabel,
+    SKOS.altLabel,
+    SKOS.hiddenLabel,
+    RDFS.label,
+    URIRef(SI + "hasSymbol"),
+    URIRef(SI + "hasAltSymbol"),
+]
+
+
+def remove_url_prefix(uri):
+    """Helper function to clean URL prefixes for display."""
+    return uri.split('#')[-1] if '#' in uri else uri.split('/')[-1]
+
+
+def build_card(results):
+    """Turn the (subj, pred, obj) rows of a search into the card shown by results2.html."""
+    # Initialize the processed results dictionary
+    processed_results = {
+        "Unit": None,
+        "Symbol": None,
+        "Quantity": None,
+        "Defining Constant": None,
+        "Defining Resolution": None,
+        "Unit Type": None,
+        "Defining Equation": None
+    }
+
+    # Process the query results
+    for subj, pred, obj in results:
+        if "hasSymbol" in pred:
+            processed_results["Symbol"] = remove_url_prefix(obj)
+        elif "hasQuantity" in pred:
+            processed_results["Quantity"] = remove_url_prefix(obj)
+        elif "hasDefiningConstant" in pred:
+            # Link to the /resolution page with query parameter
+            processed_results["Defining Constant"] = f'<a href="/resolution?value={obj}" target="_blank">{remove_url_prefix(obj)}</a>'
+        elif "hasDefiningResolution" in pred:
+            # Link to the /resolution page with query parameter
+            processed_results["Defining Resolution"] = f'<a href="/resolution?value={obj}" target="_blank">{remove_url_prefix(obj)}</a>'
+        elif "hasUnitTypeAsString" in pred:
+            processed_results["Unit Type"] = remove_url_prefix(obj)
+        elif "hasUnit" in pred:
+            processed_results["Unit"] = remove_url_prefix(obj)
+        elif "hasDefiningEquation" in pred:
+            processed_results["Defining Equation"] = obj.strip()  # Keep as plain text for MathJax rendering
+
+    return processed_results
+
+
+def _link(obj):
+    return f'<a href="/resolution?value={obj}" target="_blank">{remove_url_prefix(obj)}</a>' if obj else None
+
+
+def symbol_card(factors):
+    """
+    Build the /search card for a symbol decomposed by unit_engine.SymbolTable
+    (one factor for "km", two for a product such as "kW·h").
+    """
+    symbol = "·".join(factor.symbol for factor in factors)
+    name = " ".join((factor.prefix_name or "") + factor.unit_name for factor in factors)
+    exponent = sum(factor.exponent or 0 for factor in factors)
+    prefixed = any(factor.prefix is not None for factor in factors)
+
+    if len(factors) > 1:
+        unit_type = "Product of units"
+    elif prefixed:
+        kind = "multiple" if exponent > 0 else "submultiple"
+        unit_type = f"Decimal {kind} of {factors[0].unit_type or 'unit'}"
+    else:
+        unit_type = factors[0].unit_type
+
+    # LaTeX for MathJax, e.g. 1\;{\rm{km}} = 10^{3}\;{\rm{m}}
+    equation = None
+    if prefixed or len(factors) > 1:
+        base = "\\;".join(f"{{\\rm{{{factor.unit_symbol}}}}}" for factor in factors)
+        scale = f"10^{{{exponent}}}\\;" if prefixed else ""
+        equation = f"1\\;{{\\rm{{{symbol}}}}} = {scale}{base}"
+
+    return {
+        "Unit": name,
+        "Symbol": symbol,
+        "Quantity": factors[0].quantity if len(factors) == 1 else None,
+        "Defining Constant": None,
+        "Defining Resolution": _link(factors[0].resolution) if len(factors) == 1 else None,
+        "Unit Type": unit_type,
+        "Defining Equation": equation,
+    }
+
+
+def lookup_forms(graph, subject):
+    """Every normalized string a user may type to find subject (local name, labels, symbols)."""
+    forms = {remove_url_prefix(str(subject))}
+    for prop in LOOKUP_PROPERTIES:
+        forms.update(str(value) for value in graph.objects(subject, prop))
+    return {form.strip().lower() for form in forms if form.strip()}
+
+
+class CardTable:
+    """
+    Precomputed /search cards for every unit, prefix and constant.
+
+    Each card is keyed by every lookup form of its subject and holds exactly
+    what search() would build for that input, so a hit replaces the index
+    search and card building with one dict lookup.
+    """
+
+    def __init__(self, graph, search_index):
+        self.cards = {}
+        for cls in CARD_CLASSES:
+            for subject in graph.subjects(RDF.type, cls):
+                for form in lookup_forms(graph, subject):
+                    if form not in self.cards:
+                        self.cards[form] = build_card(search_index.search(form))
+
+    def __contains__(self, key):
+        return key in self.cards
+
+    def __getitem__(self, key):
+        return self.cards[key]
+
+    def __len__(self):
+        return len(self.cards)
+
+
+class SubjectIndex:
+    """
+    Outgoing edges of every IRI subject, already turned into the rows that
+    resolution.html and quantity_details.html display, in the order
+    SELECT ?pred ?obj WHERE { <subject> ?pred ?obj } returns them.
+    """
+
+    def __init__(self, graph):
+        rows = defaultdict(list)
+        for subj, pred, obj in graph.triples((None, None, None)):
+            if isinstance(subj, URIRef):
+                rows[str(subj)].append({"Predicate": remove_url_prefix(str(pred)), "Object": remove_url_prefix(str(obj))})
+        self.rows = dict(rows)
+
+    def get(self, subject):
+        """Return the display rows for subject (an empty list if it has none)."""
+        return self.rows.get(subject, [])
+
+
+class LabelIndex:
+    """
+    Display label of every IRI that has an rdfs:label or skos:prefLabel.
+
+    An English label is preferred over an untagged one, and rdfs:label over
+    skos:prefLabel; labels in other languages are not used.
+    """
+
+    def __init__(self, graph):
+        ranked = {}
+        for rank, prop in enumerate(LABEL_PROPERTIES):
+            for subj, _, value in graph.triples((None, prop, None)):
+                if not isinstance(subj, URIRef) or not isinstance(value, Literal):
+                    continue
+                if value.language == "en":
+                    key = rank
+                elif value.language is None:
+                    key = len(LABEL_PROPERTIES) + rank
+                else:
+                    continue
+                subj = str(subj)
+                if subj not in ranked or key < ranked[subj][0]:
+                    ranked[subj] = (key, str(value))
+        self.labels = {subj: text for subj, (_, text) in ranked.items()}
+
+    def get(self, iri):
+        """Return the label of iri, or iri itself if it has none."""
+        return self.labels.get(str(iri), str(iri))
+
+    def resolve(self, iris):
+        """Return {iri: label} for every iri in iris (see get)."""
+        return {str(iri): self.get(iri) for iri in iris}
@@ -0,0 +1,50 @@
+"""
+The loaded SI graph together with everything the routes derive from it.
+"""
+import os
+from datetime import datetime, timezone
+from itertools import chain
+
+from cards import CardTable, SubjectIndex
+from graph_loader import TTL_FILES, load_graph, source_hash
+from search_index import FoldedLabelIndex, FuzzyIndex, NgramBloomFilter, SearchIndex, SuggestIndex
+from unit_engine import ConversionTable, DimensionIndex, SymbolTable
+
+
+class Dataset:
+    """
+    The SI graph and its lookup structures.
+    Everything here is built from the same graph, so a reload builds a new
+    Dataset as a whole instead of patching the old one.
+    version identifies the graph (the hex source hash) for caches and ETags,
+    last_modified is the newest modification time of its source files.
+    """
+
+    def __init__(self, graph, version=None, last_modified=None):
+        self.graph = graph
+        self.version = version
+        self.last_modified = last_modified
+        self.search_index = SearchIndex(graph)
+        self.suggestions = SuggestIndex(graph)
+        self.fuzzy = FuzzyIndex(graph)
+        self.folded_labels = FoldedLabelIndex(graph)
+        self.cards = CardTable(graph, self.search_index)
+        self.subjects = SubjectIndex(graph)
+        self.symbols = SymbolTable(graph)
+        self.dimensions = DimensionIndex(graph)
+        self.conversions = ConversionTable(graph, self.symbols, self.dimensions)
+        self.ngram_filter = NgramBloomFilter(chain(
+            self.search_index.texts(), self.cards.cards, self.symbols.symbols, self.fuzzy.words,
+            self.folded_labels.labels(),
+        ))
+
+
+def load_dataset(paths=TTL_FILES, workers=None):
+    """
+    Load the graph (see graph_loader.load_graph, which parses in up to
+    workers processes when the snapshot is stale) and build its Dataset.
+    """
+    digest = source_hash(paths)
+    last_modified = datetime.fromtimestamp(max(os.path.getmtime(path) for path in paths), timezone.utc)
+    return Dataset(load_graph(paths, digest=digest, workers=workers), version=digest.hex(),
+                   last_modified=last_modified)
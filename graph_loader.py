@@ -0,0 +1,372 @@
+"""
+Loading of the SI Turtle files.
+
+Parsing the six Turtle files with rdflib is the slowest part of starting the
+app, so the merged graph is compiled once into a binary snapshot: an interned
+term table plus the store's three sorted triple indexes.  The snapshot
+records a hash of the source files and is only used while those files are
+unchanged.  It is memory-mapped read-only, and the indexes are used in place,
+so every worker (including ones gunicorn starts later, or a separate admin
+process) attaches to the same physical pages instead of building its own.
+
+When the snapshot has to be rebuilt, each file is parsed in its own worker
+process (see parse_sources_parallel) and the results are merged.  Subject
+blocks repeated from an earlier file, such as the si: ontology header, are
+skipped before parsing (see turtle_blocks).
+
+Build the snapshot ahead of time (e.g. as a deploy build step) with:
+
+    python graph_loader.py
+"""
+import hashlib
+import mmap
+import multiprocessing
+import os
+import pathlib
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import rdflib
+from rdflib.term import BNode, Literal, URIRef
+
+from array_store import ArrayStore, build_indexes
+from turtle_blocks import plan_sources
+
+# Source files, in the order the app has always parsed them
+TTL_FILES = [
+    "si.ttl",
+    "quantities.ttl",
+    "decisions.ttl",
+    "constants.ttl",
+    "units.ttl",
+    "prefixes.ttl",
+]
+
+SNAPSHOT_PATH = "si_graph.bin"
+
+# Bump FORMAT_VERSION whenever the layout below, or what goes into it,
+# changes; older snapshots are then ignored and rebuilt from the Turtle files.
+# Version 2: repeated subject blocks are loaded once (see turtle_blocks).
+# Version 3: the spo, pos and osp indexes replace the triple array.
+MAGIC = b"SIGRAPH\0"
+FORMAT_VERSION = 3
+
+# magic, format version, term count, triple count, namespace section size,
+# term section size, sha256 of the source files; then the namespaces, the
+# term section, padding to a multiple of 8 bytes and the three indexes as
+# little-endian uint64 keys
+HEADER = struct.Struct("<8sIIIII32s")
+
+
+def source_hash(paths=TTL_FILES):
+    """Return the sha256 digest over the names and contents of the source files."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def parse_sources(paths=TTL_FILES):
+    """Parse the Turtle files into a single rdflib graph."""
+    g = rdflib.Graph()
+    for path in paths:
+        g.parse(path, format="ttl")
+    return g
+
+
+def _block_triples(graph, subject):
+    """Number of triples about subject, including those of blank nodes nested under it."""
+    count = 0
+    pending, seen = [URIRef(subject)], set()
+    while pending:
+        for _, _, obj in graph.triples((pending.pop(), None, None)):
+            count += 1
+            if isinstance(obj, BNode) and obj not in seen:
+                seen.add(obj)
+                pending.append(obj)
+    return count
+
+
+def parse_file(plan):
+    """
+    Parse the text of one turtle_blocks.FilePlan into a compact, picklable
+    form for parse_sources_parallel: ((namespaces, encoded terms, triples),
+    (parse seconds, triples per shared block)).  namespaces are (prefix, uri)
+    string pairs, the terms are encode_term() strings and triples is a flat
+    array of indexes into them.
+    """
+    start = time.perf_counter()
+    g = rdflib.Graph()
+    g.parse(data=plan.text, format="ttl", publicID=pathlib.Path(plan.path).absolute().as_uri())
+    seconds = time.perf_counter() - start
+
+    terms, triples = intern_graph(g)
+    namespaces = [(prefix, str(uri)) for prefix, uri in g.namespaces()]
+    shared = {key: _block_triples(g, subject) for key, subject in plan.shared.items()}
+    return (namespaces, [encode_term(term) for term in terms], triples), (seconds, shared)
+
+
+def merge_parsed(parsed):
+    """
+    Merge the (namespaces, encoded terms, triples) parts of parse_file()
+    results, in order, into (namespaces, terms, triples) for
+    write_snapshot_arrays.  Terms are interned across files and duplicate
+    triples are kept once, at their first occurrence.
+    """
+    namespaces = {}
+    ids = {}
+    terms = []
+    seen = {}
+    for file_namespaces, encoded_terms, file_triples in parsed:
+        for prefix, uri in file_namespaces:
+            if prefix not in namespaces and uri not in namespaces.values():
+                namespaces[prefix] = uri
+
+        local_ids = []
+        for encoded in encoded_terms:
+            term_id = ids.get(encoded)
+            if term_id is None:
+                term_id = ids[encoded] = len(terms)
+                terms.append(decode_term(encoded))
+            local_ids.append(term_id)
+
+        for i in range(0, len(file_triples), 3):
+            triple = (local_ids[file_triples[i]], local_ids[file_triples[i + 1]], local_ids[file_triples[i + 2]])
+            seen.setdefault(triple, None)
+
+    triples = array("I", (term_id for triple in seen for term_id in triple))
+    return [(prefix, URIRef(uri)) for prefix, uri in namespaces.items()], terms, triples
+
+
+def default_workers(paths=TTL_FILES):
+    """One parse process per file, at most the CPU count."""
+    return min(len(paths), os.cpu_count() or 1)
+
+
+def parse_sources_parallel(paths=TTL_FILES, workers=None, dedupe=True, report=None):
+    """
+    Parse the Turtle files in up to workers processes and merge them with
+    merge_parsed.  With a single worker, or inside a worker process, the
+    files are parsed in this process.  workers defaults to one per file, at
+    most the CPU count, with the fork start method, and to 1 otherwise: a
+    spawned child re-imports the main module, which for the app means
+    loading it again while the parent is still importing it.  The build step
+    (python graph_loader.py) asks for the processes explicitly.
+
+    Unless dedupe is false, subject blocks already loaded from an earlier
+    file are not parsed again (see turtle_blocks).  If report is a list, a
+    dict per file is appended to it with the triples and parse time saved;
+    parse time saved is estimated from the parse time per byte of the file
+    the skipped blocks were first loaded from.
+    """
+    plans = plan_sources(paths, dedupe)
+    if workers is None:
+        workers = default_workers(paths) if multiprocessing.get_start_method() == "fork" else 1
+    if workers <= 1 or len(paths) <= 1 or multiprocessing.parent_process() is not None:
+        results = [parse_file(plan) for plan in plans]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_file, plans))
+
+    if report is not None:
+        report.extend(_dedupe_report(plans, [timing for _, timing in results]))
+    return merge_parsed(parsed for parsed, _ in results)
+
+
+def _dedupe_report(plans, timings):
+    """Per-file statistics of parse_sources_parallel (see there)."""
+    owners = {}
+    for plan, (seconds, shared) in zip(plans, timings):
+        seconds_per_byte = seconds / max(len(plan.text.encode("utf-8")), 1)
+        for key, triples in shared.items():
+            owners[key] = triples, seconds_per_byte
+
+    report = []
+    for plan, (seconds, _) in zip(plans, timings):
+        report.append({
+            "file": os.path.basename(plan.path),
+            "blocks": plan.blocks,
+            "skipped_blocks": len(plan.skipped),
+            "bytes_saved": sum(plan.skipped.values()),
+            "triples_saved": sum(owners[key][0] for key in plan.skipped),
+            "parse_ms": seconds * 1000,
+            "parse_ms_saved": sum(size * owners[key][1] for key, size in plan.skipped.items()) * 1000,
+        })
+    return report
+
+
+def encode_term(term):
+    """Encode an rdflib term as a string for the snapshot term table."""
+    if isinstance(term, Literal):
+        return "L" + "\0".join([term.language or "", term.datatype or "", str(term)])
+    if isinstance(term, BNode):
+        return "B" + str(term)
+    return "U" + str(term)
+
+
+def decode_term(encoded):
+    """Inverse of encode_term."""
+    kind, value = encoded[0], encoded[1:]
+    if kind == "L":
+        lang, datatype, lexical = value.split("\0", 2)
+        return Literal(lexical, lang=lang or None, datatype=URIRef(datatype) if datatype else None)
+    if kind == "B":
+        return BNode(value)
+    return URIRef(value)
+
+
+def intern_graph(graph):
+    """
+    Intern every term of the graph.
+    Returns (terms, triples) where triples is a flat array of term ids,
+    three per triple, in the graph's iteration order.
+    """
+    ids = {}
+    terms = []
+    triples = array("I")
+    for triple in graph.triples((None, None, None)):
+        for term in triple:
+            term_id = ids.get(term)
+            if term_id is None:
+                term_id = ids[term] = len(terms)
+                terms.append(term)
+            triples.append(term_id)
+    return terms, triples
+
+
+def _little_endian(values):
+    """Return the bytes of an array('I') or array('Q') in little-endian order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _padding(size):
+    return b"\0" * (-size % 8)
+
+
+def write_snapshot(graph, path=SNAPSHOT_PATH, digest=None):
+    """Compile the graph into a snapshot file (written atomically)."""
+    terms, triples = intern_graph(graph)
+    write_snapshot_arrays(list(graph.namespaces()), terms, triples, path, digest)
+
+
+def write_snapshot_arrays(namespaces, terms, triples, path=SNAPSHOT_PATH, digest=None):
+    """Write already interned (namespaces, terms, triples) as a snapshot file (atomically)."""
+    if digest is None:
+        digest = source_hash()
+
+    namespaces = "\n".join(f"{prefix}\0{uri}" for prefix, uri in namespaces).encode("utf-8")
+
+    offsets = array("I", [0])
+    blob = bytearray()
+    for term in terms:
+        blob += encode_term(term).encode("utf-8")
+        offsets.append(len(blob))
+    term_section = _little_endian(offsets) + bytes(blob)
+    indexes = build_indexes(triples)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(terms), len(indexes[0]),
+                         len(namespaces), len(term_section), digest)
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(namespaces)
+        f.write(term_section)
+        f.write(_padding(HEADER.size + len(namespaces) + len(term_section)))
+        for index in indexes:
+            f.write(_little_endian(index))
+    # Processes that mapped the old file keep it until they let go of it
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path=SNAPSHOT_PATH, digest=None):
+    """
+    Map a snapshot file and return (namespaces, terms, (spo, pos, osp)).
+    The terms are decoded; the indexes are read-only memoryviews of the
+    mapping (copies on big-endian hosts).  Returns None if the file is
+    missing, has another format version or was built from different source
+    files.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # ValueError: the file is empty
+        return None
+
+    if len(data) < HEADER.size:
+        return None
+    magic, version, n_terms, n_triples, ns_size, terms_size, snapshot_digest = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    if digest is not None and snapshot_digest != digest:
+        return None
+
+    pos = HEADER.size
+    namespaces = data[pos:pos + ns_size].decode("utf-8")
+    namespaces = [tuple(line.split("\0")) for line in namespaces.split("\n")] if namespaces else []
+    pos += ns_size
+
+    offsets = array("I")
+    offsets.frombytes(data[pos:pos + 4 * (n_terms + 1)])
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    blob = pos + 4 * (n_terms + 1)
+    terms = [decode_term(data[blob + offsets[i]:blob + offsets[i + 1]].decode("utf-8")) for i in range(n_terms)]
+    pos += terms_size
+    pos += -pos % 8
+
+    view = memoryview(data)
+    indexes = []
+    for _ in range(3):
+        index = view[pos:pos + 8 * n_triples].cast("Q")
+        if sys.byteorder == "big":
+            index = array("Q", index)
+            index.byteswap()
+        indexes.append(index)
+        pos += 8 * n_triples
+    return [(prefix, URIRef(uri)) for prefix, uri in namespaces], terms, tuple(indexes)
+
+
+def load_graph(paths=TTL_FILES, snapshot_path=SNAPSHOT_PATH, digest=None, workers=None):
+    """
+    Return the merged SI graph as a read-only graph backed by an ArrayStore.
+    Maps the binary snapshot when it matches the current source files,
+    otherwise parses the Turtle files (in up to workers processes, see
+    parse_sources_parallel), refreshes the snapshot and maps that.
+    digest is source_hash(paths), for callers that have already computed it.
+    """
+    if digest is None:
+        digest = source_hash(paths)
+    snapshot = read_snapshot(snapshot_path, digest)
+    if snapshot is None:
+        namespaces, terms, triples = parse_sources_parallel(paths, workers)
+        try:
+            write_snapshot_arrays(namespaces, terms, triples, snapshot_path, digest)
+            snapshot = read_snapshot(snapshot_path, digest)
+        except OSError as e:
+            print(f"Could not write graph snapshot {snapshot_path}: {e}")
+        if snapshot is None:
+            snapshot = namespaces, terms, build_indexes(triples)
+
+    namespaces, terms, indexes = snapshot
+    return rdflib.Graph(store=ArrayStore(terms, namespaces=namespaces, indexes=indexes))
+
+
+if __name__ == "__main__":
+    report = []
+    namespaces, terms, triples = parse_sources_parallel(workers=default_workers(), report=report)
+    write_snapshot_arrays(namespaces, terms, triples)
+    print(f"{'file':<16} {'blocks':>6} {'skipped':>7} {'triples saved':>13} {'parse ms':>9} {'ms saved':>9}")
+    for row in report:
+        print(f"{row['file']:<16} {row['blocks']:6d} {row['skipped_blocks']:7d} {row['triples_saved']:13d} "
+              f"{row['parse_ms']:9.1f} {row['parse_ms_saved']:9.1f}")
+    print(f"Wrote {SNAPSHOT_PATH} ({len(triples) // 3} triples)")
@@ -0,0 +1,77 @@
+"""
+Gunicorn settings, picked up from the working directory by `gunicorn app:app`.
+
+The app, and with it the SI graph and every index built from it, is loaded
+once in the master (preload_app) and shared with the forked workers
+copy-on-write.  Sharing only survives as long as the workers do not write to
+those pages: the cyclic garbage collector writes to every tracked object it
+visits, so collection is disabled while the app loads and everything loaded
+is moved to the permanent generation with gc.freeze() right before each fork
+(including the forks that replace workers recycled by max_requests).  The
+workers then collect only what they allocate themselves.
+
+Set SI_PRELOAD=0 to load the app in every worker instead, e.g. to compare
+memory use with measure_memory.py.  The worker count comes from
+WEB_CONCURRENCY or --workers, as usual.
+
+Changed .ttl files are reloaded without a restart (see reloader.py).  With
+preload_app the master watches them; on a change, on SIGHUP to the master
+or on POST /api/admin/reload in a worker, the master rebuilds the data
+(on_reload) and gunicorn replaces the workers with new ones forked from it,
+so the new data is shared as the old was.  Without preload_app every worker
+watches and reloads by itself.
+"""
+import gc
+import os
+import signal
+
+preload_app = os.environ.get("SI_PRELOAD", "1") != "0"
+
+if preload_app:
+    # Objects freed while the app loads would leave holes in shared pages
+    # that the workers would later fill, and so copy
+    gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        # A change makes the master reload and fork new workers, see on_reload
+        from app import reloader
+
+        reloader.watch(on_change=lambda: os.kill(server.pid, signal.SIGHUP))
+
+
+def on_reload(server):
+    # Runs in the master on SIGHUP, before the new workers are forked; the
+    # old workers keep serving the old data until they are replaced
+    if preload_app:
+        from app import reloader
+
+        reloader.reload(force=True, wait=True)
+        # Free the old data (frozen at the last fork, and gc is off here);
+        # pre_fork freezes the new data again
+        gc.unfreeze()
+        gc.collect()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def post_worker_init(worker):
+    from app import reloader
+
+    if preload_app:
+        # Reloads happen in the master, see on_reload
+        reloader.delegate_to(worker.ppid)
+        return
+    # Each worker reloads the SI data by itself when the .ttl files change
+    # or it gets SIGHUP; gunicorn has installed the worker's own signal
+    # handlers by now, and threads must start after fork
+    reloader.install_signal_handler()
+    reloader.watch()
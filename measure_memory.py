@@ -0,0 +1,126 @@
+"""
+Measure the memory of the gunicorn master and its workers, with and without
+preloading the app (see gunicorn.conf.py), as the worker count grows.
+
+For each run gunicorn is started on a local port, every route is warmed up
+with a few requests, and /proc/<pid>/smaps_rollup (Linux) is read for each
+process:
+
+    RSS  resident memory, shared pages counted in full by every process
+    PSS  proportional set size, shared pages split between the processes
+    USS  unique set size, the private pages a process alone holds
+
+The sum of PSS over the master and workers is the memory the whole server
+really uses; with preloading the per-worker USS should stay small and flat.
+
+    python measure_memory.py [worker counts, e.g. 1,2,4,8]
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+WORKER_COUNTS = [1, 2, 4, 8]
+WARMUP_PATHS = [
+    "/search?q=metre",
+    "/search?q=kW+h",
+    "/search?q=degre+celsius",
+    "/api/v1/search?q=planck",
+    "/suggest?q=kilo",
+    "/resolution?value=https://si-digital-framework.org/SI/units/metre",
+    "/convert?value=1&from=km&to=m",
+]
+WARMUP_ROUNDS = 20
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid):
+    """Pids of the direct children of pid."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name is in parentheses and may contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def memory(pid):
+    """(RSS, PSS, USS) of pid in KiB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                values[name] = int(rest.split()[0])
+    return values["Rss"], values["Pss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+def _wait_ready(port, workers, process, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+            if len(_children(process.pid)) >= workers:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start in time")
+
+
+def run(workers, preload):
+    """Start gunicorn, warm it up and return [(role, RSS, PSS, USS)] for the master and workers."""
+    port = _free_port()
+    env = dict(os.environ, SI_PRELOAD="1" if preload else "0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "--workers", str(workers),
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _wait_ready(port, workers, process)
+        for _ in range(WARMUP_ROUNDS * workers):
+            for path in WARMUP_PATHS:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=30).read()
+        rows = [("master", *memory(process.pid))]
+        rows += [("worker", *memory(pid)) for pid in _children(process.pid)]
+        return rows
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(worker_counts=WORKER_COUNTS):
+    print("KiB; worker columns are the mean over the workers")
+    print(f"{'preload':>7} {'workers':>7} {'master RSS':>10} {'worker RSS':>10} {'worker PSS':>10} "
+          f"{'worker USS':>10} {'total PSS':>10}")
+    for preload in (False, True):
+        for workers in worker_counts:
+            rows = run(workers, preload)
+            master = rows[0]
+            worker_rows = rows[1:]
+            n = len(worker_rows)
+            mean = [sum(row[i] for row in worker_rows) // n for i in (1, 2, 3)]
+            total = sum(row[2] for row in rows)
+            print(f"{'yes' if preload else 'no':>7} {n:7d} {master[1]:10d} {mean[0]:10d} {mean[1]:10d} "
+                  f"{mean[2]:10d} {total:10d}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else WORKER_COUNTS)
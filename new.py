@@ -1,6 +1,9 @@
 from flask import Flask, render_template, request
 import rdflib, re
 
+from cards import LabelIndex
+from queries import run_query
+
 app = Flask(__name__)
 
 # Load RDF graphs from Turtle (.ttl) files
@@ -12,6 +15,9 @@ g.parse("constants.ttl", format="ttl")
 g.parse("units.ttl", format="ttl")
 g.parse("prefixes.ttl", format="ttl")
 
+# Labels of every IRI, built once instead of queried per row
+labels = LabelIndex(g)
+
 
 def remove_url_prefix(uri):
     """
@@ -39,28 +45,9 @@ def search():
 
     try:
         # SPARQL query to fetch relevant data related to the given SI unit
-        query = f"""
-        SELECT ?subj ?pred ?obj
-        WHERE {{
-            ?subj ?pred ?obj .
-            FILTER(
-                CONTAINS(LCASE(STR(?subj)), "{si_unit}") || 
-                CONTAINS(LCASE(STR(?obj)), "{si_unit}")
-            ) .
-            FILTER (?pred IN (
-                <https://si-digital-framework.org/SI#hasSymbol>,
-                <https://si-digital-framework.org/SI#hasQuantity>,
-                <https://si-digital-framework.org/SI#hasDefiningConstant>,
-                <https://si-digital-framework.org/SI#hasDefiningResolution>,
-                <https://si-digital-framework.org/SI#hasUnitTypeAsString>,
-                <https://si-digital-framework.org/SI#hasUnit>,
-                <https://si-digital-framework.org/SI#hasDefiningEquation>
-            ))
-        }}
-        """
 
         # Execute the query on the RDF graph
-        results = g.query(query)
+        results = run_query(g, "search", needle=si_unit)
 
         # Dictionary to store processed results
         processed_results = {
@@ -144,21 +131,10 @@ def format_symbol(symbol):
 
 def resolve_label(uri):
     """
-    Queries the RDF graph to retrieve a human-readable label for a given URI.
+    Returns the human-readable label for a given URI from the label index.
     If no label is found, return the original URI.
     """
-    query = f"""
-    SELECT ?label WHERE {{
-        <{uri}> rdfs:label ?label .
-        FILTER (lang(?label) = "en" || lang(?label) = "")
-    }}
-    """
-    result = g.query(query)
-    
-    for row in result:
-        return str(row[0])  # Return the first found label
-    
-    return uri  # Fallback to the raw URI if no label is found
+    return labels.get(uri)
 
 @app.route('/resolution')
 def resolution():
@@ -173,13 +149,7 @@ def resolution():
 
     try:
         # SPARQL query to fetch information about the object from the graph
-        query = f"""
-        SELECT ?pred ?obj
-        WHERE {{
-            <{obj_value}> ?pred ?obj .
-        }}
-        """
-        results = g.query(query)
+        results = run_query(g, "resolution", subject=rdflib.URIRef(obj_value))
 
         # Define a mapping for user-friendly labels
         predicate_mapping = {
@@ -190,6 +160,12 @@ def resolution():
             "hasValueAsString": "Numerical Value"
         }
 
+        # Resolve the labels of all Unit IRIs in one batch
+        unit_labels = labels.resolve(
+            row[1] for row in results
+            if remove_url_prefix(str(row[0])) == "hasUnit" and isinstance(row[1], rdflib.URIRef)
+        )
+
         # Process query results into a structured list of dictionaries
         data = []
         for row in results:
@@ -208,8 +184,8 @@ def resolution():
                 object_value = format_symbol(object_value)
 
             # Special handling for Unit field (resolve label)
-            if predicate == "hasUnit" and object_value.startswith("http"):
-                object_value = resolve_label(object_value)
+            if predicate == "hasUnit" and str(row[1]) in unit_labels:
+                object_value = unit_labels[str(row[1])]
 
             data.append({"Predicate": predicate_label, "Object": object_value})
 
@@ -0,0 +1,57 @@
+"""
+Named SPARQL queries, parsed and translated once at import.
+
+rdflib parses and translates a query string on every Graph.query() call,
+which costs far more than evaluating these queries.  The queries here are
+compiled once with prepareQuery, and user input is passed as initBindings,
+so it can only ever be a value and never change the query itself.
+
+    results = run_query(g, "search", needle="metre")
+"""
+from rdflib import Literal, URIRef
+from rdflib.plugins.sparql.processor import prepareQuery
+
+# Query text by name; ?variables listed in the comment are bound by the caller
+QUERY_TEXT = {
+    # ?needle: lowercased search text
+    "search": """
+        SELECT ?subj ?pred ?obj
+        WHERE {
+            ?subj ?pred ?obj .
+            FILTER(
+                CONTAINS(LCASE(STR(?subj)), ?needle) ||
+                CONTAINS(LCASE(STR(?obj)), ?needle)
+            ) .
+            FILTER (?pred IN (
+                <https://si-digital-framework.org/SI#hasSymbol>,
+                <https://si-digital-framework.org/SI#hasQuantity>,
+                <https://si-digital-framework.org/SI#hasDefiningConstant>,
+                <https://si-digital-framework.org/SI#hasDefiningResolution>,
+                <https://si-digital-framework.org/SI#hasUnitTypeAsString>,
+                <https://si-digital-framework.org/SI#hasUnit>,
+                <https://si-digital-framework.org/SI#hasDefiningEquation>
+            ))
+        }
+    """,
+    # ?subject: IRI whose outgoing edges are listed
+    "resolution": """
+        SELECT ?pred ?obj
+        WHERE {
+            ?subject ?pred ?obj .
+        }
+    """,
+}
+
+QUERIES = {name: prepareQuery(text) for name, text in QUERY_TEXT.items()}
+
+
+def _term(value):
+    """Turn a binding value into an rdflib term (plain strings become literals)."""
+    if isinstance(value, (Literal, URIRef)):
+        return value
+    return Literal(value)
+
+
+def run_query(graph, name, **bindings):
+    """Evaluate the prepared query called name on graph with ?variable=value bindings."""
+    return graph.query(QUERIES[name], initBindings={key: _term(value) for key, value in bindings.items()})
@@ -0,0 +1,148 @@
+"""
+Hot reload of the SI data without restarting the app.
+
+A Reloader holds the current Dataset.  reload() builds a complete new
+Dataset from the Turtle files in a background thread and then replaces the
+single reference to it; requests keep the Dataset they started with (see
+app.dataset), so in-flight requests finish on the old data and nothing is
+dropped.  A reload is triggered by
+
+  - a change to any of the source files, when watch() is running,
+  - SIGHUP, once install_signal_handler() has been called,
+  - POST /api/admin/reload.
+
+Each process holds its own Reloader.  Under gunicorn with preload_app the
+reload happens once, in the master (see gunicorn.conf.py): the master
+watches the files, and on a change or on SIGHUP rebuilds its Dataset and
+replaces its workers with new ones forked from it, so they share the new
+data copy-on-write as they shared the old.  The workers hand reload()
+on to the master (delegate_to()).  Without preload_app every worker
+watches the files and reloads by itself; memory then stays per worker, as
+it was before.
+"""
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+
+from dataset import load_dataset
+from graph_loader import TTL_FILES, source_hash
+
+
+class Reloader:
+    """Owner of the current Dataset; see the module docstring."""
+
+    def __init__(self, paths=TTL_FILES):
+        self.paths = list(paths)
+        self.dataset = load_dataset(self.paths)
+        # Reentrant: the SIGHUP handler may run while the main thread holds it
+        self._lock = threading.RLock()
+        self._thread = None
+        self._delegate = None
+        self._mtimes = self._source_mtimes()
+        self.reloads = 0
+        self.last = None
+
+    def _source_mtimes(self):
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def reload(self, force=False, wait=False):
+        """
+        Start a reload in a background thread, unless one is already running.
+        Unless force is true, nothing is rebuilt while the source hash matches
+        the current Dataset.  Returns True if a reload was started; with wait,
+        blocks until it has finished.  After delegate_to(), only signals the
+        process that reloads (force and wait do not apply).
+        """
+        if self._delegate is not None:
+            os.kill(*self._delegate)
+            return True
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                started = False
+            else:
+                self._thread = threading.Thread(target=self._reload, args=(force,), name="si-reload",
+                                                daemon=True)
+                self._thread.start()
+                started = True
+            thread = self._thread
+        if wait:
+            thread.join()
+        return started
+
+    def _reload(self, force):
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        old_version = self.dataset.version
+        # Taken first, so that a change made during the reload triggers another
+        mtimes = self._source_mtimes()
+        try:
+            if not force and source_hash(self.paths).hex() == old_version:
+                result = "unchanged"
+            else:
+                # Parse in this process: forking a pool from a threaded
+                # worker is not safe
+                new = load_dataset(self.paths, workers=1)
+                # The swap: requests that start from now on see the new data
+                self.dataset = new
+                self.reloads += 1
+                result = "reloaded"
+        except Exception as e:
+            result = f"failed: {e}"
+        self._mtimes = mtimes
+
+        self.last = {
+            "started": started_at.isoformat(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "result": result,
+            "previous_version": old_version,
+            "version": self.dataset.version,
+        }
+        print(f"SI data reload {result} in {self.last['duration_ms']} ms (version {self.dataset.version[:12]})")
+
+    def status(self):
+        """The current version, whether a reload is running, and how the last one went."""
+        return {
+            "version": self.dataset.version,
+            "last_modified": self.dataset.last_modified.isoformat(),
+            "running": self._thread is not None and self._thread.is_alive(),
+            "reloads": self.reloads,
+            "last": self.last,
+        }
+
+    def delegate_to(self, pid, signum=None):
+        """Make reload() send signum (SIGHUP by default) to pid, e.g. the gunicorn master, instead of reloading here."""
+        self._delegate = (pid, signum or signal.SIGHUP)
+
+    def watch(self, interval=2.0, on_change=None):
+        """
+        Poll the modification times of the source files every interval
+        seconds and reload on a change, or call on_change() instead.
+        """
+        def poll():
+            while True:
+                time.sleep(interval)
+                mtimes = self._source_mtimes()
+                if mtimes == self._mtimes:
+                    continue
+                if on_change is None:
+                    self.reload()
+                else:
+                    # Once per change; the reload it leads to takes the times again
+                    self._mtimes = mtimes
+                    on_change()
+
+        threading.Thread(target=poll, name="si-reload-watch", daemon=True).start()
+
+    def install_signal_handler(self, signum=None):
+        """Reload on signum, SIGHUP by default (must be called from the main thread; no-op without SIGHUP)."""
+        signum = signum or getattr(signal, "SIGHUP", None)
+        if signum is not None:
+            signal.signal(signum, lambda signum, frame: self.reload())
@@ -1,6 +1,8 @@
 from flask import Flask, render_template, request
 import rdflib
 
+from queries import run_query
+
 app = Flask(__name__)
 
 # Load RDF graphs
@@ -29,28 +31,9 @@ def search():
 
     try:
         # SPARQL query to fetch relevant data
-        query = f"""
-        SELECT ?subj ?pred ?obj
-        WHERE {{
-            ?subj ?pred ?obj .
-            FILTER(
-                CONTAINS(LCASE(STR(?subj)), "{si_unit}") || 
-                CONTAINS(LCASE(STR(?obj)), "{si_unit}")
-            ) .
-            FILTER (?pred IN (
-                <https://si-digital-framework.org/SI#hasSymbol>,
-                <https://si-digital-framework.org/SI#hasQuantity>,
-                <https://si-digital-framework.org/SI#hasDefiningConstant>,
-                <https://si-digital-framework.org/SI#hasDefiningResolution>,
-                <https://si-digital-framework.org/SI#hasUnitTypeAsString>,
-                <https://si-digital-framework.org/SI#hasUnit>,
-                <https://si-digital-framework.org/SI#hasDefiningEquation>
-            ))
-        }}
-        """
         
         # Execute the query on the graph
-        results = g.query(query)
+        results = run_query(g, "search", needle=si_unit)
 
         # Initialize the processed results dictionary
         processed_results = {
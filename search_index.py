@@ -0,0 +1,412 @@
+"""
+In-memory indexes used by the /search and /suggest routes.
+"""
+import hashlib
+import heapq
+import math
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import RDFS, SKOS
+
+SI = "https://si-digital-framework.org/SI#"
+
+# The predicates /search reports on
+SEARCH_PREDICATES = [
+    URIRef(SI + "hasSymbol"),
+    URIRef(SI + "hasQuantity"),
+    URIRef(SI + "hasDefiningConstant"),
+    URIRef(SI + "hasDefiningResolution"),
+    URIRef(SI + "hasUnitTypeAsString"),
+    URIRef(SI + "hasUnit"),
+    URIRef(SI + "hasDefiningEquation"),
+]
+
+
+# (property, accepted languages or None for any) of the strings /suggest completes
+SUGGEST_PROPERTIES = [
+    (SKOS.prefLabel, {"en", "fr", None}),
+    (SKOS.altLabel, None),
+    (SKOS.hiddenLabel, None),
+    (URIRef(SI + "hasSymbol"), None),
+]
+
+
+# Label properties indexed by FoldedLabelIndex
+FOLDED_LABEL_PROPERTIES = [SKOS.prefLabel, SKOS.altLabel, SKOS.hiddenLabel, RDFS.label]
+
+
+def fold(text):
+    """Accent-fold (NFKD without combining marks) and casefold text: "Degré" -> "degre"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+def trigrams(text):
+    """Return the set of 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _pack_strings(strings):
+    """Concatenate strings into one str, plus an array('I') of the len(strings) + 1 boundaries."""
+    offsets = array("I", [0])
+    for text in strings:
+        offsets.append(offsets[-1] + len(text))
+    return "".join(strings), offsets
+
+
+def subject_popularity(graph):
+    """Number of triples referring to each IRI (as object), a static popularity score."""
+    return Counter(obj for obj in graph.objects() if isinstance(obj, URIRef))
+
+
+def label_strings(graph):
+    """Yield (subject, text) for every non-empty string in SUGGEST_PROPERTIES."""
+    for prop, languages in SUGGEST_PROPERTIES:
+        for subj, value in graph.subject_objects(prop):
+            if not isinstance(subj, URIRef) or not isinstance(value, Literal):
+                continue
+            if languages is not None and value.language not in languages:
+                continue
+            text = str(value).strip()
+            if text:
+                yield subj, text
+
+
+def edit_distance(a, b):
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, previous2[j - 2] + 1)
+            current.append(cost)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word, max_distance):
+    """word and every string obtained by deleting up to max_distance characters from it."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - variants
+        variants |= frontier
+    return variants
+
+
+class SearchIndex:
+    """
+    Trigram index over the triples whose predicate is one of SEARCH_PREDICATES.
+
+    search(needle) returns the same rows, in the same order, as the SPARQL
+    query /search used to run:
+
+        ?subj ?pred ?obj .
+        FILTER(CONTAINS(LCASE(STR(?subj)), needle) || CONTAINS(LCASE(STR(?obj)), needle))
+        FILTER(?pred IN (...SEARCH_PREDICATES...))
+
+    The rows, their lowercased texts and the posting lists live in a few
+    flat buffers (one str or array each, addressed by offsets) rather than
+    in one small object per row or trigram.  Searching then only reads
+    those buffers, so it writes no reference counts into memory pages that
+    gunicorn workers share with the master (see gunicorn.conf.py).
+    """
+
+    def __init__(self, graph):
+        predicates = set(SEARCH_PREDICATES)
+        self.rows = []
+        lowered = []
+        postings = defaultdict(set)
+
+        # Scan in the graph's own iteration order so that callers which keep
+        # the last value per predicate see the same result as the old query
+        for subj, pred, obj in graph.triples((None, None, None)):
+            if pred not in predicates:
+                continue
+            row_id = len(self.rows)
+            subj_text, obj_text = str(subj).lower(), str(obj).lower()
+            self.rows.append((str(subj), str(pred), str(obj)))
+            lowered.append(f"{subj_text}\0{obj_text}\0")
+            for gram in trigrams(subj_text) | trigrams(obj_text):
+                postings[gram].add(row_id)
+
+        # The "subject\0object\0" lowercased text of row i is
+        # _lowered[_lowered_offsets[i]:_lowered_offsets[i + 1]]
+        self._lowered, self._lowered_offsets = _pack_strings(lowered)
+
+        # The ids of a trigram are _posting_ids[start:start + count], with
+        # start and count packed into one int
+        self._posting_ids = array("I")
+        self._postings = {}
+        for gram, ids in postings.items():
+            self._postings[gram] = (len(self._posting_ids) << 32) | len(ids)
+            self._posting_ids.extend(sorted(ids))
+
+    def texts(self):
+        """The lowercased subject and object strings of the indexed rows."""
+        offsets = self._lowered_offsets
+        for i in range(len(self.rows)):
+            yield from self._lowered[offsets[i]:offsets[i + 1] - 1].split("\0")
+
+    def _scan(self, needle):
+        """Ids of the rows containing needle, found in one pass over the whole text."""
+        lowered, offsets = self._lowered, self._lowered_offsets
+        matches = []
+        row_id, end = 0, offsets[1]
+        pos = lowered.find(needle)
+        while pos >= 0:
+            while end <= pos:
+                row_id += 1
+                end = offsets[row_id + 1]
+            matches.append(row_id)
+            pos = lowered.find(needle, end)
+        return matches
+
+    def _candidates(self, needle):
+        """Row ids that may contain needle (None for needles under 3 characters)."""
+        grams = trigrams(needle)
+        if not grams:
+            return None
+        spans = []
+        for gram in grams:
+            span = self._postings.get(gram)
+            if span is None:
+                return ()
+            spans.append((span & 0xFFFFFFFF, span >> 32))
+        spans.sort()
+        ids = self._posting_ids
+        count, start = spans[0]
+        candidates = set(ids[start:start + count])
+        for count, start in spans[1:]:
+            candidates.intersection_update(ids[start:start + count])
+        return sorted(candidates)
+
+    def search(self, needle):
+        """Return the (subj, pred, obj) string rows where subject or object contains needle."""
+        needle = needle.lower()
+        # The separators between texts can never be matched
+        if "\0" in needle:
+            return []
+        if not needle:
+            return list(self.rows)
+        candidates = self._candidates(needle)
+        if candidates is None:
+            return [self.rows[i] for i in self._scan(needle)]
+        lowered, offsets = self._lowered, self._lowered_offsets
+        return [
+            self.rows[i] for i in candidates
+            if lowered.find(needle, offsets[i], offsets[i + 1]) >= 0
+        ]
+
+
+class SuggestIndex:
+    """
+    Prefix completion over the labels and symbols in SUGGEST_PROPERTIES.
+
+    The lowercased strings are kept in one sorted list, so the completions of
+    a prefix are the slice found by two bisections.  Each subject's popularity
+    is the number of triples that refer to it, computed once at build time;
+    complete() returns one suggestion per subject, most popular first.
+    """
+
+    def __init__(self, graph):
+        popularity = subject_popularity(graph)
+
+        names = {}
+        for subj, value in graph.subject_objects(SKOS.prefLabel):
+            if isinstance(value, Literal) and (value.language == "en" or subj not in names):
+                names[subj] = str(value)
+
+        entries = sorted({(text.lower(), text, str(subj)) for subj, text in label_strings(graph)})
+        self._keys = [key for key, _, _ in entries]
+        self._entries = [
+            (popularity[URIRef(subj)], text, subj, names.get(URIRef(subj), text))
+            for _, text, subj in entries
+        ]
+
+    def complete(self, prefix, limit=10):
+        """Return up to limit {"text", "label", "iri", "score"} dicts for strings starting with prefix."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+
+        # Best matching string per subject: most popular, then shortest
+        best = {}
+        for score, text, subj, label in self._entries[lo:hi]:
+            current = best.get(subj)
+            if current is None or len(text) < len(current[1]):
+                best[subj] = (score, text, subj, label)
+
+        top = heapq.nsmallest(limit, best.values(), key=lambda entry: (-entry[0], len(entry[1]), entry[1]))
+        return [{"text": text, "label": label, "iri": subj, "score": score} for score, text, subj, label in top]
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant lookup of the strings in SUGGEST_PROPERTIES (symmetric
+    delete, as in SymSpell).
+
+    Every string is stored under each variant obtained by deleting up to
+    MAX_DISTANCE characters from its first PREFIX_LENGTH characters.  A query
+    generates the same variants, so candidates come from a few dict lookups
+    instead of a scan over all strings; only those candidates are checked
+    with edit_distance().
+    """
+
+    MAX_DISTANCE = 2
+    PREFIX_LENGTH = 7
+
+    def __init__(self, graph):
+        popularity = subject_popularity(graph)
+        self.words = {}
+        for subj, text in label_strings(graph):
+            word = text.lower()
+            self.words[word] = max(self.words.get(word, 0), popularity[subj])
+
+        deletes = defaultdict(list)
+        for word in self.words:
+            for variant in _deletes(word[:self.PREFIX_LENGTH], self.MAX_DISTANCE):
+                deletes[variant].append(word)
+        self._deletes = {variant: tuple(words) for variant, words in deletes.items()}
+
+    @staticmethod
+    def allowed_distance(term):
+        """Edits tolerated for term: none below 3 characters, one up to 4, else two."""
+        if len(term) < 3:
+            return 0
+        return 1 if len(term) <= 4 else 2
+
+    def lookup(self, term, limit=5):
+        """
+        Return up to limit (word, distance) pairs within allowed_distance(term)
+        of term, closest first, then most popular.
+        """
+        term = term.strip().lower()
+        max_distance = self.allowed_distance(term)
+        candidates = set()
+        for variant in _deletes(term[:self.PREFIX_LENGTH], max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+
+        matches = []
+        for word in candidates:
+            if abs(len(word) - len(term)) > max_distance:
+                continue
+            distance = edit_distance(term, word)
+            if distance <= max_distance:
+                matches.append((distance, -self.words[word], word))
+        matches.sort()
+        return [(word, distance) for distance, _, word in matches[:limit]]
+
+
+class FoldedLabelIndex:
+    """
+    Exact lookup of labels after fold(), so "metre" finds "mètre"@fr and
+    "degre celsius" finds "degré Celsius"@fr.  Each entry keeps the label's
+    language tag (None when untagged) so that lookups can be limited to one
+    language.
+    """
+
+    def __init__(self, graph):
+        entries = defaultdict(list)
+        for prop in FOLDED_LABEL_PROPERTIES:
+            for subj, value in graph.subject_objects(prop):
+                if isinstance(subj, URIRef) and isinstance(value, Literal) and str(value).strip():
+                    entries[fold(str(value))].append((str(subj), value.language, str(value)))
+        self._entries = {key: tuple(dict.fromkeys(values)) for key, values in entries.items()}
+        # Language tags of the labels, for validating a requested language
+        self.languages = frozenset(lang for values in self._entries.values() for _, lang, _ in values if lang)
+
+    def lookup(self, text, lang=None):
+        """Return the (subject, lang, label) entries whose folded label equals fold(text), in lang if given."""
+        entries = self._entries.get(fold(text), ())
+        if lang is None:
+            return list(entries)
+        return [entry for entry in entries if entry[1] == lang]
+
+    def subjects(self, text, lang=None):
+        """The distinct subjects of lookup(text, lang), in index order."""
+        return list(dict.fromkeys(subject for subject, _, _ in self.lookup(text, lang)))
+
+    def labels(self):
+        """The folded labels in the index."""
+        return iter(self._entries)
+
+
+class NgramBloomFilter:
+    """
+    Bloom filter over the trigrams of fold() of every searchable string.
+
+    A query with more absent trigrams than allowed_missing cannot match:
+    substring and label matches need every trigram to be present, and each
+    edit a fuzzy match tolerates changes at most three trigrams.  Such
+    queries are rejected before any lookup.  Hashing is blake2b-based, so
+    the bit array is the same in every process.
+
+    Besides the estimated false-positive rate of the bit array, stats()
+    reports the observed one: queries that passed the filter but matched
+    nothing (recorded through record_false_positive()) over all queries that
+    matched nothing.
+    """
+
+    def __init__(self, texts, false_positive_rate=0.01):
+        grams = set()
+        for text in texts:
+            grams |= trigrams(fold(text))
+
+        n = max(len(grams), 1)
+        self.size = max(64, math.ceil(-n * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / n * math.log(2)))
+        self.grams = len(grams)
+        self._bits = bytearray((self.size + 7) // 8)
+        for gram in grams:
+            for i in self._positions(gram):
+                self._bits[i >> 3] |= 1 << (i & 7)
+
+        self.checks = self.rejections = self.false_positives = 0
+
+    def _positions(self, gram):
+        digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, gram):
+        return all(self._bits[i >> 3] & (1 << (i & 7)) for i in self._positions(gram))
+
+    def rejects(self, text, allowed_missing=0):
+        """True if more than allowed_missing trigrams of fold(text) are certainly absent."""
+        self.checks += 1
+        missing = 0
+        for gram in trigrams(fold(text)):
+            if gram not in self:
+                missing += 1
+                if missing > allowed_missing:
+                    self.rejections += 1
+                    return True
+        return False
+
+    def record_false_positive(self):
+        """Count a query that passed rejects() but matched nothing."""
+        self.false_positives += 1
+
+    def stats(self):
+        fill = sum(bin(byte).count("1") for byte in self._bits) / self.size
+        misses = self.rejections + self.false_positives
+        return {
+            "bits": self.size,
+            "hashes": self.hashes,
+            "trigrams": self.grams,
+            "fill_ratio": fill,
+            "estimated_fpr": fill ** self.hashes,
+            "checks": self.checks,
+            "rejections": self.rejections,
+            "false_positives": self.false_positives,
+            "observed_fpr": self.false_positives / misses if misses else None,
+        }
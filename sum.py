@@ -1,6 +1,9 @@
 from flask import Flask, render_template, request
 import rdflib
 
+from cards import SubjectIndex
+from queries import run_query
+
 app = Flask(__name__)
 
 # Load RDF graphs
@@ -12,6 +15,9 @@ g.parse("constants.ttl", format="ttl")
 g.parse("units.ttl", format="ttl")
 g.parse("prefixes.ttl", format="ttl")
 
+# Predicate/object rows of every subject, for /quantity_details
+subjects = SubjectIndex(g)
+
 
 def remove_url_prefix(uri):
     """Helper function to clean URL prefixes for display."""
@@ -39,26 +45,7 @@ def search():
 
     try:
         # SPARQL query to fetch relevant data
-        query = f"""
-        SELECT ?subj ?pred ?obj
-        WHERE {{
-            ?subj ?pred ?obj .
-            FILTER(
-                CONTAINS(LCASE(STR(?subj)), "{si_unit}") || 
-                CONTAINS(LCASE(STR(?obj)), "{si_unit}")
-            ) .
-            FILTER (?pred IN (
-                <https://si-digital-framework.org/SI#hasSymbol>,
-                <https://si-digital-framework.org/SI#hasQuantity>,
-                <https://si-digital-framework.org/SI#hasDefiningConstant>,
-                <https://si-digital-framework.org/SI#hasDefiningResolution>,
-                <https://si-digital-framework.org/SI#hasUnitTypeAsString>,
-                <https://si-digital-framework.org/SI#hasUnit>,
-                <https://si-digital-framework.org/SI#hasDefiningEquation>
-            ))
-        }}
-        """
-        results = g.query(query)
+        results = run_query(g, "search", needle=si_unit)
 
         # Initialize the processed results
         processed_results = {
@@ -117,20 +104,8 @@ def quantity_details():
         return render_template('quantity_details.html', heading="No Quantity Provided", data=[])
 
     try:
-        # SPARQL query to fetch details about the Quantity
-        query = f"""
-        SELECT ?pred ?obj
-        WHERE {{
-            <{obj_value}> ?pred ?obj .
-        }}
-        """
-        results = g.query(query)
-
-        # Debugging output
-        print(f"Query Results for Quantity: {list(results)}")
-
-        # Process the results into a list of dictionaries
-        data = [{"Predicate": remove_url_prefix(str(row[0])), "Object": remove_url_prefix(str(row[1]))} for row in results]
+        # Precomputed predicate/object rows of the quantity
+        data = subjects.get(obj_value)
 
         # Set the heading to the Quantity object value
         heading = f"Details about Quantity: {remove_url_prefix(obj_value)}"
@@ -1767,26 +1742,7 @@ def search():
     si_unit = request.form.get('si_unit', '').strip().lower()
 
     try:
-        query = f"""
-        SELECT ?subj ?pred ?obj
-        WHERE {{
-            ?subj ?pred ?obj .
-            FILTER(
-                CONTAINS(LCASE(STR(?subj)), "{si_unit}") || 
-                CONTAINS(LCASE(STR(?obj)), "{si_unit}")
-            ) .
-            FILTER (?pred IN (
-                <https://si-digital-framework.org/SI#hasSymbol>,
-                <https://si-digital-framework.org/SI#hasQuantity>,
-                <https://si-digital-framework.org/SI#hasDefiningConstant>,
-                <https://si-digital-framework.org/SI#hasDefiningResolution>,
-                <https://si-digital-framework.org/SI#hasUnitTypeAsString>,
-                <https://si-digital-framework.org/SI#hasUnit>,
-                <https://si-digital-framework.org/SI#hasDefiningEquation>
-            ))
-        }}
-        """
-        results = g.query(query)
+        results = run_query(g, "search", needle=si_unit)
 
         processed_results = {
             "Unit": None,
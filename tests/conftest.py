@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The .ttl files and the graph snapshot are found relative to the working directory
+os.chdir(ROOT)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app import app
+
+    return app.test_client()
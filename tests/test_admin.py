@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setenv('SI_ADMIN_TOKEN', 'secret')
+    return 'secret'
+
+
+def test_reload_closed_without_token(client, monkeypatch):
+    monkeypatch.delenv('SI_ADMIN_TOKEN', raising=False)
+    # The test client comes from 127.0.0.1, like every client behind a local proxy
+    assert client.get('/api/admin/reload').status_code == 403
+    assert client.post('/api/admin/reload').status_code == 403
+
+
+def test_reload_requires_the_token(client, token):
+    assert client.get('/api/admin/reload').status_code == 403
+    assert client.get('/api/admin/reload', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    response = client.get('/api/admin/reload', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.get_json()["version"]
@@ -0,0 +1,30 @@
+import pytest
+
+
+def test_unit(client):
+    response = client.get('/api/v1/units/metre')
+    assert response.status_code == 200
+    assert response.get_json()["Symbol"] == "m"
+
+
+def test_unit_by_symbol(client):
+    assert client.get('/api/v1/units/km').get_json()["Unit"] == "kilometre"
+
+
+@pytest.mark.parametrize("unit_id, unit", [("ampère", "ampere"), ("mètre", "metre"), ("degree celsius", "degreeCelsius")])
+def test_unit_with_empty_card_falls_back_to_its_subject(client, unit_id, unit):
+    card = client.get(f'/api/v1/units/{unit_id}').get_json()
+    assert card["Unit"] == unit
+    assert any(value is not None for value in card.values())
+
+
+@pytest.mark.parametrize("unit_id", ["nothing", "aucun", "gas"])
+def test_unknown_unit(client, unit_id):
+    response = client.get(f'/api/v1/units/{unit_id}')
+    assert response.status_code == 404
+    assert "error" in response.get_json()
+
+
+def test_unit_fields(client):
+    response = client.get('/api/v1/units/metre', query_string={'fields': 'Unit, Symbol,Nonexistent'})
+    assert response.get_json() == {"Unit": "metre", "Symbol": "m"}
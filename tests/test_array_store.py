@@ -0,0 +1,84 @@
+from itertools import product
+
+import pytest
+import rdflib
+from rdflib import BNode, Literal, URIRef
+from rdflib.graph import ModificationException
+
+from array_store import ID_MASK, ArrayStore, _pack, _unpack
+from graph_loader import intern_graph, read_snapshot, write_snapshot_arrays
+
+EX = rdflib.Namespace("http://example.org/")
+
+
+@pytest.fixture(scope="module")
+def memory_graph():
+    g = rdflib.Graph()
+    g.parse("units.ttl", format="turtle")
+    node = BNode()
+    g.add((EX.a, EX.p, Literal("mètre", lang="fr")))
+    g.add((EX.a, EX.p, Literal("1.5", datatype=rdflib.XSD.decimal)))
+    g.add((EX.a, EX.q, node))
+    g.add((node, EX.p, EX.a))
+    # The same term as subject, predicate and object
+    g.add((EX.p, EX.p, EX.p))
+    return g
+
+
+def array_graph(g):
+    terms, triples = intern_graph(g)
+    return rdflib.Graph(store=ArrayStore(terms, triples, namespaces=g.namespaces()))
+
+
+def patterns(g):
+    """Every combination of bound and unbound positions for a sample of triples, plus unknown terms."""
+    sample = sorted(g, key=str)[::25] + [(EX.a, EX.q, None), (EX.p, EX.p, EX.p)]
+    for s, p, o in sample:
+        for mask in product((False, True), repeat=3):
+            yield tuple(term if keep else None for term, keep in zip((s, p, o), mask))
+    yield EX.missing, None, None
+    yield None, EX.missing, EX.a
+    yield None, None, Literal("metre", lang="en")
+
+
+def test_pack_round_trip():
+    for ids in [(0, 0, 0), (1, 2, 3), (ID_MASK, 0, ID_MASK), (ID_MASK, ID_MASK, ID_MASK)]:
+        assert _unpack(_pack(*ids)) == ids
+
+
+def test_triples_match_the_memory_store(memory_graph):
+    g = array_graph(memory_graph)
+    assert len(g) == len(memory_graph)
+    assert set(g) == set(memory_graph)
+    for pattern in patterns(memory_graph):
+        assert sorted(g.triples(pattern)) == sorted(memory_graph.triples(pattern)), pattern
+
+
+def test_duplicate_triples_are_stored_once():
+    g = rdflib.Graph()
+    g.add((EX.a, EX.p, EX.b))
+    terms, triples = intern_graph(g)
+    store = ArrayStore(terms, triples * 3)
+    assert len(store) == 1
+
+
+def test_snapshot_round_trip(memory_graph, tmp_path):
+    path = str(tmp_path / "graph.bin")
+    terms, triples = intern_graph(memory_graph)
+    write_snapshot_arrays(list(memory_graph.namespaces()), terms, triples, path, digest=b"\0" * 32)
+    assert read_snapshot(path, digest=b"\1" * 32) is None
+
+    g = rdflib.Graph(store="SIArray")
+    g.open(path)
+    assert set(g) == set(memory_graph)
+    for pattern in patterns(memory_graph):
+        assert sorted(g.triples(pattern)) == sorted(memory_graph.triples(pattern)), pattern
+    assert dict(g.namespaces())["si"] == dict(memory_graph.namespaces())["si"]
+
+
+def test_read_only(memory_graph):
+    g = array_graph(memory_graph)
+    with pytest.raises(ModificationException):
+        g.add((EX.a, EX.p, EX.b))
+    with pytest.raises(ModificationException):
+        g.remove((EX.a, None, None))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+
+def test_convert(client):
+    response = client.get('/convert', query_string={'value': '1.5', 'from': 'km', 'to': 'm'})
+    assert response.status_code == 200
+    assert response.get_json()["result"] == pytest.approx(1500)
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "abc"])
+def test_convert_rejects_non_finite_values(client, value):
+    response = client.get('/convert', query_string={'value': value, 'from': 'km', 'to': 'm'})
+    assert response.status_code == 400
+
+
+def test_convert_rejects_overflow(client):
+    response = client.get('/convert', query_string={'value': '1e308', 'from': 'km', 'to': 'mm'})
+    assert response.status_code == 400
+
+
+def test_batch(client):
+    response = client.post('/api/convert/batch', json={"values": [1, 2.5], "from": "km", "to": "m"})
+    assert response.status_code == 200
+    assert response.get_json()["values"] == pytest.approx([1000, 2500])
+
+
+def test_batch_binary(client):
+    response = client.post('/api/convert/batch?from=km&to=m', data=np.array([1.0, 2.0], '<f8').tobytes(),
+                           content_type='application/octet-stream')
+    assert response.status_code == 200
+    assert np.frombuffer(response.data, '<f8').tolist() == [1000.0, 2000.0]
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    3,
+    "values",
+    {"values": [True, 2], "from": "km", "to": "m"},
+    {"values": [[1], [2]], "from": "km", "to": "m"},
+    {"values": "12", "from": "km", "to": "m"},
+    {"values": [1], "from": "km"},
+])
+def test_batch_rejects_bad_bodies(client, body):
+    assert client.post('/api/convert/batch', json=body).status_code == 400
+
+
+@pytest.mark.parametrize("body", [
+    '{"values": [NaN], "from": "km", "to": "m"}',
+    '{"values": [Infinity], "from": "km", "to": "m"}',
+    '{"values": [1e308], "from": "km", "to": "mm"}',
+])
+def test_batch_rejects_non_finite_values(client, body):
+    response = client.post('/api/convert/batch', data=body, content_type='application/json')
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+import multiprocessing
+
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+
+import graph_loader
+from graph_loader import TTL_FILES, parse_sources_parallel
+
+
+class NoPool:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("no process pool expected")
+
+
+@pytest.mark.parametrize("method", ["spawn", "forkserver"])
+def test_no_default_pool_without_fork(monkeypatch, method):
+    monkeypatch.setattr(multiprocessing, "get_start_method", lambda *args, **kwargs: method)
+    monkeypatch.setattr(graph_loader, "ProcessPoolExecutor", NoPool)
+    monkeypatch.setattr(graph_loader.os, "cpu_count", lambda: 8)
+    namespaces, terms, triples = parse_sources_parallel(TTL_FILES[:2])
+    assert len(triples) > 0
+
+
+def as_graph(parsed):
+    namespaces, terms, triples = parsed
+    g = rdflib.Graph()
+    for i in range(0, len(triples), 3):
+        g.add((terms[triples[i]], terms[triples[i + 1]], terms[triples[i + 2]]))
+    return g
+
+
+def test_parallel_matches_sequential():
+    sequential = parse_sources_parallel(TTL_FILES, workers=1)
+    parallel = parse_sources_parallel(TTL_FILES, workers=2)
+    assert sequential[0] == parallel[0]
+    assert isomorphic(as_graph(sequential), as_graph(parallel))
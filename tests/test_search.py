@@ -0,0 +1,54 @@
+import pytest
+
+
+def search(client, q, **params):
+    return client.get('/api/v1/search', query_string=dict(params, q=q))
+
+
+@pytest.mark.parametrize("q", ["gas", "ham", "Gym", "has", "Pas", "mass", "cat"])
+def test_words_are_not_split_into_unit_products(client, q):
+    response = search(client, q)
+    assert response.status_code in (200, 404)
+    assert response.get_json().get("Unit Type") != "Product of units"
+    assert b"Product of units" not in client.get('/search', query_string={'q': q}).data
+
+
+def test_substring_match_is_not_hidden_by_symbols(client):
+    assert search(client, "has").get_json()["Unit"] == "radian"
+    assert search(client, "Pas").get_json()["Unit"] == "pascal"
+
+
+@pytest.mark.parametrize("q", ["kW·h", "kW h", "kW*h", "kW⋅h"])
+def test_explicit_products(client, q):
+    card = search(client, q).get_json()
+    assert card["Unit"] == "kilowatt hour"
+    assert card["Symbol"] == "kW·h"
+    assert card["Unit Type"] == "Product of units"
+
+
+def test_prefixed_symbol(client):
+    card = search(client, "km").get_json()
+    assert card["Unit"] == "kilometre"
+    assert card["Symbol"] == "km"
+
+
+@pytest.mark.parametrize("q, lang, unit", [("metre", "fr", "metre"), ("mètre", "en", "metre"), ("degre celsius", "fr", "degreeCelsius")])
+def test_lang(client, q, lang, unit):
+    assert search(client, q, lang=lang).get_json()["Unit"] == unit
+
+
+def test_lang_limits_labels(client):
+    # "jour" is a French label of the day
+    assert search(client, "jour", lang="fr").get_json()["Symbol"] == "d"
+    assert search(client, "jour", lang="en").status_code == 404
+
+
+@pytest.mark.parametrize("path", ['/api/v1/search', '/search'])
+def test_unknown_lang(client, path):
+    assert client.get(path, query_string={'q': 'metre', 'lang': 'xx'}).status_code == 400
+
+
+def test_unknown_lang_is_escaped(client):
+    response = client.get('/search', query_string={'q': 'metre', 'lang': '<script>alert(1)</script>'})
+    assert response.status_code == 400
+    assert b"<script>" not in response.data
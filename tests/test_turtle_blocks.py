@@ -0,0 +1,79 @@
+import rdflib
+from rdflib.compare import isomorphic
+
+from turtle_blocks import block_subject, is_directive, plan_sources, split_statements
+
+PREFIXES = "@prefix ex: <http://example.org/> .\n"
+
+
+def test_split_statements():
+    text = PREFIXES + 'ex:a ex:p "x" .\n\nex:b ex:p ex:c ;\n    ex:q ex:d .\n'
+    assert split_statements(text) == [
+        "@prefix ex: <http://example.org/> .",
+        'ex:a ex:p "x" .',
+        "ex:b ex:p ex:c ;\n    ex:q ex:d .",
+    ]
+
+
+def test_separators_inside_strings_iris_and_comments():
+    text = PREFIXES + (
+        '# a comment. with ; and # in it\n'
+        'ex:a ex:p "1. a; b # c" ;  # trailing. comment ;\n'
+        '    ex:q <http://example.org/x.y#z;w> ;\n'
+        "    ex:r 'single. quoted' ;\n"
+        '    ex:s """long.\n'
+        'string ; with "quotes". and # hash""" ;\n'
+        '    ex:t "escaped \\" quote." .\n'
+        'ex:b ex:p [ ex:q "in. brackets" ] , ( ex:c ex:d ) .\n'
+    )
+    statements = split_statements(text)
+    assert len(statements) == 3
+    assert statements[1].startswith("ex:a") and statements[1].endswith('"escaped \\" quote." .')
+    assert statements[2].startswith("ex:b")
+    # Splitting must not change what the text means
+    whole = rdflib.Graph().parse(data=text, format="turtle")
+    parts = rdflib.Graph().parse(data="\n".join(statements), format="turtle")
+    assert isomorphic(whole, parts)
+
+
+def test_decimal_and_prefixed_name_dots():
+    text = PREFIXES + "ex:a ex:p 1.5 , ex:b.c .\nex:d ex:p ex:e.\n"
+    assert split_statements(text)[1:] == ["ex:a ex:p 1.5 , ex:b.c .", "ex:d ex:p ex:e."]
+
+
+def test_sparql_directives():
+    text = "PREFIX ex: <http://example.org/>\nBASE <http://example.org/>\nex:a ex:p ex:b .\n"
+    statements = split_statements(text)
+    assert statements == ["PREFIX ex: <http://example.org/>", "BASE <http://example.org/>", "ex:a ex:p ex:b ."]
+    assert [is_directive(s) for s in statements] == [True, True, False]
+    # A prefixed name that starts like a directive is a subject
+    assert not is_directive("prefixes:atto ex:p ex:b .")
+
+
+def test_block_subject():
+    prefixes = {"ex": "http://example.org/", "": "http://default.org/"}
+    assert block_subject("ex:a ex:p ex:b .", prefixes) == "http://example.org/a"
+    assert block_subject(":a ex:p ex:b .", prefixes) == "http://default.org/a"
+    assert block_subject("<http://x.org/a> ex:p ex:b .", prefixes) == "http://x.org/a"
+    assert block_subject("_:n ex:p ex:b .", prefixes) is None
+    assert block_subject("[ ex:p ex:b ] ex:q ex:c .", prefixes) is None
+    assert block_subject("other:a ex:p ex:b .", prefixes) is None
+
+
+def test_plan_sources_skips_repeated_blocks(tmp_path):
+    shared = 'ex:header ex:p "shared. block" .\n'
+    first, second = tmp_path / "a.ttl", tmp_path / "b.ttl"
+    first.write_text(PREFIXES + shared + "ex:a ex:p ex:b .\n", encoding="utf-8")
+    second.write_text(PREFIXES + shared + "ex:c ex:p ex:d .\n_:n ex:p ex:e .\n", encoding="utf-8")
+
+    plans = plan_sources([str(first), str(second)])
+    assert "ex:header" in plans[0].text
+    assert "ex:header" not in plans[1].text
+    assert "_:n" in plans[1].text
+    assert list(plans[0].shared.values()) == ["http://example.org/header"]
+    assert len(plans[1].skipped) == 1
+    assert [plan.blocks for plan in plans] == [2, 3]
+
+    # A block under another prefix IRI is a different block
+    second.write_text("@prefix ex: <http://other.org/> .\n" + shared, encoding="utf-8")
+    assert "ex:header" in plan_sources([str(first), str(second)])[1].text
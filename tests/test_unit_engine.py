@@ -0,0 +1,105 @@
+import pytest
+
+from unit_engine import BASE_UNITS, Conversion, ConversionError, _ExpressionParser
+
+
+def base(index, factor=1.0):
+    dimension = [0] * len(BASE_UNITS)
+    dimension[index] = 1
+    return Conversion(tuple(dimension), factor, 0.0)
+
+
+def dimension(**exponents):
+    order = ["m", "kg", "s", "A", "K", "mol", "cd"]
+    return tuple(exponents.get(name, 0) for name in order)
+
+
+# BASE_UNITS order: metre, kilogram, second, ampere, kelvin, mole, candela
+UNITS = {
+    "m": base(0),
+    "km": base(0, 1e3),
+    "kg": base(1),
+    "g": base(1, 1e-3),
+    "s": base(2),
+    "h": base(2, 3600.0),
+    "K": base(4),
+    "°C": base(4)._replace(offset=273.15),
+}
+
+
+def unit(symbol):
+    if symbol not in UNITS:
+        raise ConversionError(f"Unknown unit: {symbol}")
+    return UNITS[symbol]
+
+
+def parse(text):
+    return _ExpressionParser(unit, text).parse()
+
+
+@pytest.mark.parametrize("text, expected_dimension, factor", [
+    ("m", dimension(m=1), 1.0),
+    ("m^2", dimension(m=2), 1.0),
+    ("m2", dimension(m=2), 1.0),
+    ("km^-1", dimension(m=-1), 1e-3),
+    ("m/s", dimension(m=1, s=-1), 1.0),
+    ("m/s^2", dimension(m=1, s=-2), 1.0),
+    ("km/h", dimension(m=1, s=-1), 1e3 / 3600),
+    ("kg·m^2/s^2", dimension(kg=1, m=2, s=-2), 1.0),
+    ("kg*m", dimension(kg=1, m=1), 1.0),
+    ("kg.m", dimension(kg=1, m=1), 1.0),
+    ("kg m", dimension(kg=1, m=1), 1.0),
+    ("g/(m s)", dimension(kg=1, m=-1, s=-1), 1e-3),
+    ("(km/h)^2", dimension(m=2, s=-2), (1e3 / 3600) ** 2),
+    ("m/s/s", dimension(m=1, s=-2), 1.0),
+    ("1/s", None, None),
+])
+def test_expressions(text, expected_dimension, factor):
+    if expected_dimension is None:
+        # A bare number is not a unit
+        with pytest.raises(ConversionError):
+            parse(text)
+        return
+    conversion = parse(text)
+    assert conversion.dimension == expected_dimension
+    assert conversion.factor == pytest.approx(factor)
+    assert conversion.offset == 0.0
+
+
+@pytest.mark.parametrize("text", [
+    "", "m/", "/m", "m^", "m^x", "m^2.5", "(m", "m)", "m s)", "()", "m**2", "m//s", "foo/s", "m + s",
+])
+def test_bad_expressions(text):
+    with pytest.raises(ConversionError):
+        parse(text)
+
+
+def test_offsets_cannot_be_combined():
+    assert parse("°C").offset == 273.15
+    with pytest.raises(ConversionError):
+        parse("°C/s")
+
+
+@pytest.fixture(scope="module")
+def conversions():
+    from app import reloader
+
+    return reloader.dataset.conversions
+
+
+@pytest.mark.parametrize("value, from_unit, to_unit, result", [
+    (1, "km", "m", 1000),
+    (36, "km/h", "m/s", 10),
+    (1, "kWh", "J", 3.6e6),
+    (1, "kW·h", "MJ", 3.6),
+    (1, "J/(kg K)", "m^2/(s^2 K)", 1),
+    (0, "°C", "K", 273.15),
+    (1, "m²", "cm^2", 1e4),
+])
+def test_table(conversions, value, from_unit, to_unit, result):
+    assert conversions.convert(value, from_unit, to_unit) == pytest.approx(result)
+
+
+def test_table_dimension_mismatch(conversions):
+    with pytest.raises(ConversionError):
+        conversions.convert(1, "m", "s")
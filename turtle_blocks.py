@@ -0,0 +1,161 @@
+"""
+Load-time deduplication of Turtle subject blocks.
+
+Every SI Turtle file except si.ttl repeats the same si: ontology header
+(about 70 subjects such as si:correspondingResolution and si:hasAltSymbol).
+plan_sources() splits each file into its top-level statements and
+fingerprints every subject block by a hash of its text and of the IRIs of
+the prefixes it uses.  A block whose fingerprint was already seen in an
+earlier file is left out of the text handed to the parser, so the header
+is parsed once instead of five times.
+
+Blocks whose subject is a blank node, or which mention a labelled blank
+node (_:x), are never skipped: their triples are not determined by the
+block text alone.
+"""
+import hashlib
+import re
+from collections import namedtuple
+
+# Prefixed names and bare prefixes ("si:", "units:metre") in a block
+PREFIX_USE = re.compile(r"(?<![\w:/.#-])([A-Za-z][\w.-]*)?:")
+PREFIX_DIRECTIVE = re.compile(r"@?prefix\s+([A-Za-z][\w.-]*)?:\s*<([^>]*)>", re.IGNORECASE)
+SPARQL_DIRECTIVE = re.compile(r"(?:PREFIX|BASE)\s", re.IGNORECASE)
+SUBJECT = re.compile(r"<([^>]*)>|([A-Za-z][\w.-]*)?:((?:[\w-]|\.(?=[\w-]))*)")
+
+
+def split_statements(text):
+    """
+    Split Turtle text into its top-level statements (directives and subject
+    blocks, each with its terminating "."), skipping comments and blank space.
+    Strings, IRIs and bracketed blank nodes or collections are kept whole.
+    """
+    statements = []
+    start = None
+    depth = 0
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if start is None:
+            if c.isspace():
+                i += 1
+                continue
+            if c == "#":
+                end = text.find("\n", i)
+                i = n if end < 0 else end + 1
+                continue
+            start = i
+            # SPARQL-style PREFIX and BASE end at the line break, not at "."
+            if SPARQL_DIRECTIVE.match(text, i):
+                end = text.find("\n", i)
+                end = n if end < 0 else end
+                statements.append(text[start:end].strip())
+                start, i = None, end
+                continue
+
+        if c in "\"'":
+            quote = c * 3 if text.startswith(c * 3, i) else c
+            i += len(quote)
+            while i < n and not text.startswith(quote, i):
+                i += 2 if text[i] == "\\" else 1
+            i += len(quote)
+            continue
+        if c == "<":
+            end = text.find(">", i)
+            i = n if end < 0 else end + 1
+            continue
+        if c == "#":
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if c in "[(":
+            depth += 1
+        elif c in "])":
+            depth -= 1
+        elif c == "." and depth == 0 and (i + 1 == n or text[i + 1].isspace()):
+            statements.append(text[start:i + 1])
+            start = None
+        i += 1
+
+    if start is not None and text[start:].strip():
+        statements.append(text[start:].strip())
+    return statements
+
+
+def is_directive(statement):
+    return statement.startswith("@") or SPARQL_DIRECTIVE.match(statement) is not None
+
+
+def block_subject(statement, prefixes):
+    """The subject IRI of a subject block, or None for blank-node subjects and unknown prefixes."""
+    match = SUBJECT.match(statement)
+    if match is None:
+        return None
+    iri, prefix, local = match.groups()
+    if iri is not None:
+        return iri
+    namespace = prefixes.get(prefix or "")
+    if namespace is None or prefix == "_":
+        return None
+    return namespace + local
+
+
+def fingerprint(statement, prefixes):
+    """Content hash of a subject block together with the IRIs of the prefixes it uses."""
+    digest = hashlib.blake2b(digest_size=16)
+    for prefix in sorted({match.group(1) or "" for match in PREFIX_USE.finditer(statement)}):
+        if prefix in prefixes:
+            digest.update(f"{prefix}\0{prefixes[prefix]}\0".encode("utf-8"))
+    digest.update(statement.encode("utf-8"))
+    return digest.digest()
+
+
+# What to parse of one file: text is the file with duplicate blocks left
+# out, size the original size in bytes and blocks its number of subject
+# blocks.  shared maps the fingerprint of each block first loaded here and
+# skipped again later to the block's subject IRI; skipped maps the
+# fingerprint of each block left out to its size in bytes.
+FilePlan = namedtuple("FilePlan", ["path", "text", "size", "blocks", "shared", "skipped"])
+
+
+def plan_sources(paths, dedupe=True):
+    """
+    Read and split the Turtle files and return a FilePlan per file, in
+    order.  With dedupe false nothing is skipped.
+    """
+    seen = {}
+    plans = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        if not dedupe:
+            plans.append(FilePlan(path, text, len(text.encode("utf-8")), 0, {}, {}))
+            continue
+
+        prefixes = {}
+        kept, skipped, blocks = [], {}, 0
+        plans.append(FilePlan(path, None, len(text.encode("utf-8")), 0, {}, skipped))
+        for statement in split_statements(text):
+            if is_directive(statement):
+                for prefix, namespace in PREFIX_DIRECTIVE.findall(statement):
+                    prefixes[prefix] = namespace
+                kept.append(statement)
+                continue
+
+            blocks += 1
+            subject = block_subject(statement, prefixes)
+            if subject is None or "_:" in statement:
+                kept.append(statement)
+                continue
+            key = fingerprint(statement, prefixes)
+            owner = seen.get(key)
+            if owner is None:
+                seen[key] = (len(plans) - 1, subject)
+                kept.append(statement)
+            else:
+                file_index, owner_subject = owner
+                plans[file_index].shared[key] = owner_subject
+                skipped[key] = len(statement.encode("utf-8"))
+
+        plans[-1] = plans[-1]._replace(text="\n\n".join(kept) + "\n", blocks=blocks)
+    return plans
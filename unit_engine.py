@@ -0,0 +1,524 @@
+"""
+Unit symbols and conversions built from units.ttl and prefixes.ttl.
+
+SymbolTable holds every unit symbol together with every allowed
+prefix + unit combination, so "km", "mA" or "µs" resolve with one dict
+lookup.  Explicit products of two symbols such as "kW·h" or "N m" are split
+into their two table entries; compact ones such as "kWh" only where the
+input is known to be a unit (ordinary words split too: "gas" = g·as).
+
+ConversionTable compiles every unit (prefixed ones included) into a
+base-dimension vector and a factor to the coherent SI unit, so converting a
+value is plain arithmetic, and converting an array of values is a single
+NumPy operation.
+"""
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+
+import numpy as np
+from rdflib import RDF, Literal, URIRef
+from rdflib.namespace import SKOS
+
+from search_index import SI
+
+UNITS = "https://si-digital-framework.org/SI/units/"
+
+UNIT_CLASSES = [
+    URIRef(SI + "SIBaseUnit"),
+    URIRef(SI + "SISpecialNamedUnit"),
+    URIRef(SI + "nonSIUnit"),
+    URIRef(SI + "MeasurementUnit"),
+]
+PREFIXED_UNIT = URIRef(SI + "PrefixedUnit")
+SI_PREFIX = URIRef(SI + "SIPrefix")
+
+HAS_SYMBOL = URIRef(SI + "hasSymbol")
+HAS_ALT_SYMBOL = URIRef(SI + "hasAltSymbol")
+HAS_SCALING_FACTOR = URIRef(SI + "hasScalingFactor")
+HAS_EXPONENT = URIRef(SI + "hasExponent")
+PREFIX_RESTRICTION = URIRef(SI + "prefixRestriction")
+
+HAS_UNIT_TYPE = URIRef(SI + "hasUnitTypeAsString")
+HAS_DEFINING_RESOLUTION = URIRef(SI + "hasDefiningResolution")
+IS_UNIT_OF_QTY_KIND = URIRef(SI + "isUnitOfQtyKind")
+
+IN_BASE_SI_UNITS = URIRef(SI + "inBaseSIUnits")
+IN_OTHER_SI_UNITS = URIRef(SI + "inOtherSIUnits")
+HAS_CONVERSION_FACTOR = URIRef(SI + "hasConversionFactor")
+HAS_CONVERSION_UNIT = URIRef(SI + "hasConversionUnit")
+HAS_NON_PREFIXED_UNIT = URIRef(SI + "hasNonPrefixedUnit")
+HAS_PREFIX = URIRef(SI + "hasPrefix")
+UNIT_POWER = URIRef(SI + "UnitPower")
+UNIT_PRODUCT = URIRef(SI + "UnitProduct")
+UNIT_MULTIPLE = URIRef(SI + "UnitMultiple")
+HAS_UNIT_BASE = URIRef(SI + "hasUnitBase")
+HAS_NUMERIC_EXPONENT = URIRef(SI + "hasNumericExponent")
+HAS_LEFT_UNIT_TERM = URIRef(SI + "hasLeftUnitTerm")
+HAS_RIGHT_UNIT_TERM = URIRef(SI + "hasRightUnitTerm")
+HAS_NUMERIC_FACTOR = URIRef(SI + "hasNumericFactor")
+HAS_UNIT_TERM = URIRef(SI + "hasUnitTerm")
+HAS_UNIT = URIRef(SI + "hasUnit")
+CONSTANT = URIRef(SI + "Constant")
+
+# Order of the exponents in a dimension vector: L, M, T, I, Θ, N, J
+BASE_UNITS = [
+    URIRef(UNITS + "metre"),
+    URIRef(UNITS + "kilogram"),
+    URIRef(UNITS + "second"),
+    URIRef(UNITS + "ampere"),
+    URIRef(UNITS + "kelvin"),
+    URIRef(UNITS + "mole"),
+    URIRef(UNITS + "candela"),
+]
+
+# Zero points of affine scales, in the coherent SI unit.  The ontology only
+# says that the degree Celsius is "in base SI units" the kelvin.
+OFFSETS = {
+    URIRef(UNITS + "degreeCelsius"): 273.15,
+}
+
+# A resolved symbol.  prefix, prefix_name and exponent are None for an
+# unprefixed unit (scaling_factor is 1.0 then).  quantity, unit_type and
+# resolution are display strings for the /search card.
+UnitSymbol = namedtuple(
+    "UnitSymbol",
+    ["symbol", "unit", "unit_name", "unit_symbol", "prefix", "prefix_name", "scaling_factor", "exponent",
+     "quantity", "unit_type", "resolution"],
+)
+
+
+# Separators of an explicit product of two symbols: "kW·h", "kW⋅h", "N*m", "N m"
+PRODUCT_SEPARATOR = re.compile(r"\s*[·⋅*]\s*|\s+")
+
+
+def normalize_symbol(symbol):
+    """
+    NFKC-normalize a symbol so that e.g. '℃' == '°C' and the micro sign
+    used in prefixes.ttl (U+00B5) == the Greek mu (U+03BC).
+    """
+    return unicodedata.normalize("NFKC", symbol.strip())
+
+
+def label(graph, subject, lang="en", prop=SKOS.prefLabel):
+    """Return the value of prop for subject in lang (else any value, else the local name)."""
+    fallback = None
+    for value in graph.objects(subject, prop):
+        if isinstance(value, Literal) and value.language == lang:
+            return str(value)
+        fallback = fallback or str(value)
+    if fallback:
+        return fallback
+    text = str(subject)
+    return text.split('#')[-1] if '#' in text else text.split('/')[-1]
+
+
+def _symbols(graph, subject):
+    return [str(s) for s in graph.objects(subject, HAS_SYMBOL)] + \
+        [str(s) for s in graph.objects(subject, HAS_ALT_SYMBOL)]
+
+
+class SymbolTable:
+    """Hash table from (normalized) unit symbol to UnitSymbol."""
+
+    def __init__(self, graph):
+        self.symbols = {}
+
+        units = []
+        for cls in UNIT_CLASSES:
+            for unit in graph.subjects(RDF.type, cls):
+                if unit not in units:
+                    units.append(unit)
+
+        details = {}
+        for unit in units:
+            quantity = graph.value(unit, IS_UNIT_OF_QTY_KIND)
+            resolution = graph.value(unit, HAS_DEFINING_RESOLUTION)
+            details[unit] = (
+                label(graph, quantity) if quantity is not None else None,
+                label(graph, unit, prop=HAS_UNIT_TYPE) if graph.value(unit, HAS_UNIT_TYPE) else None,
+                str(resolution) if resolution is not None else None,
+            )
+
+        # Plain unit symbols first so they win over a prefixed reading
+        # (e.g. "cd" is the candela, not a centi-day)
+        for unit in units:
+            for symbol in _symbols(graph, unit):
+                self._add(UnitSymbol(symbol, unit, label(graph, unit), symbol, None, None, 1.0, None,
+                                     *details[unit]))
+
+        prefixes = []
+        for prefix in graph.subjects(RDF.type, SI_PREFIX):
+            for symbol in _symbols(graph, prefix):
+                factor = graph.value(prefix, HAS_SCALING_FACTOR)
+                exponent = graph.value(prefix, HAS_EXPONENT)
+                resolution = graph.value(prefix, HAS_DEFINING_RESOLUTION)
+                prefixes.append((symbol, prefix, float(factor), int(exponent),
+                                 str(resolution) if resolution is not None else None))
+        # Longer prefix symbols first ("da" before "d")
+        prefixes.sort(key=lambda p: -len(p[0]))
+
+        for unit in units:
+            # prefixRestriction true means the unit takes no prefixes; the
+            # kilogram takes them through the gram instead
+            restricted = graph.value(unit, PREFIX_RESTRICTION)
+            if (restricted is not None and restricted.toPython() is True) or \
+                    (unit, RDF.type, PREFIXED_UNIT) in graph:
+                continue
+            unit_name = label(graph, unit)
+            quantity, unit_type, unit_resolution = details[unit]
+            for unit_symbol in _symbols(graph, unit):
+                for prefix_symbol, prefix, factor, exponent, resolution in prefixes:
+                    self._add(UnitSymbol(prefix_symbol + unit_symbol, unit, unit_name, unit_symbol,
+                                         prefix, label(graph, prefix), factor, exponent,
+                                         quantity, unit_type, resolution or unit_resolution))
+
+    def _add(self, entry):
+        key = normalize_symbol(entry.symbol)
+        self.symbols.setdefault(key, entry)
+
+    def get(self, symbol):
+        """Return the UnitSymbol for symbol, or None."""
+        return self.symbols.get(normalize_symbol(symbol))
+
+    def resolve(self, symbol):
+        """
+        Decompose a symbol into a list of UnitSymbol factors.
+        A known symbol gives one factor; an explicit product of two known
+        symbols ("kW·h", "kW h", "N*m") gives two.  Returns None if nothing
+        matches.
+        """
+        symbol = normalize_symbol(symbol)
+        entry = self.symbols.get(symbol)
+        if entry is not None:
+            return [entry]
+        parts = PRODUCT_SEPARATOR.split(symbol)
+        if len(parts) == 2:
+            factors = [self.symbols.get(part) for part in parts]
+            if all(factor is not None for factor in factors):
+                return factors
+        return None
+
+    def split_compact(self, symbol):
+        """
+        The two UnitSymbol factors of a compact product of known symbols
+        ("kWh", "Nm"), or None.  Many ordinary words split this way too
+        ("gas" = g·as, "ham" = ha·m), so only use it where the input is
+        known to be a unit.
+        """
+        symbol = normalize_symbol(symbol)
+        for i in range(len(symbol) - 1, 0, -1):
+            left, right = self.symbols.get(symbol[:i]), self.symbols.get(symbol[i:])
+            if left is not None and right is not None:
+                return [left, right]
+        return None
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+class ConversionError(ValueError):
+    """Raised when a value cannot be converted between two units."""
+
+
+# value_in_si = value * factor + offset, for a unit whose dimension is the
+# vector of base-unit exponents
+Conversion = namedtuple("Conversion", ["dimension", "factor", "offset"])
+
+
+# Marks a node whose evaluation is in progress, to stop on cyclic terms
+_IN_PROGRESS = object()
+
+
+class DimensionIndex:
+    """
+    Memoized reduction of unit terms to (dimension vector, factor).
+
+    Every named unit, every constant's si:hasUnit and every
+    UnitPower/UnitProduct/UnitMultiple node is evaluated once at load time;
+    shared subterms are only walked once.  units_by_dimension and
+    constants_by_dimension then answer "what else measures this" with a
+    hash lookup.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._memo = {}
+
+        for cls in (UNIT_POWER, UNIT_PRODUCT, UNIT_MULTIPLE):
+            for node in graph.subjects(RDF.type, cls):
+                self.evaluate(node)
+
+        self.units_by_dimension = defaultdict(list)
+        for cls in UNIT_CLASSES:
+            for unit in graph.subjects(RDF.type, cls):
+                result = self.evaluate(unit)
+                if result is not None and unit not in self.units_by_dimension[result[0]]:
+                    self.units_by_dimension[result[0]].append(unit)
+
+        self.constants_by_dimension = defaultdict(list)
+        for constant in graph.subjects(RDF.type, CONSTANT):
+            term = graph.value(constant, HAS_UNIT)
+            result = self.evaluate(term) if term is not None else None
+            if result is not None:
+                self.constants_by_dimension[result[0]].append(constant)
+
+    def evaluate(self, node):
+        """
+        Reduce a unit or a UnitPower/UnitProduct/UnitMultiple term to
+        (dimension vector, factor).  Returns None for units that are not
+        expressed in SI units (e.g. the bel and the neper).
+        """
+        if node is None:
+            return None
+        if node in self._memo:
+            result = self._memo[node]
+            return None if result is _IN_PROGRESS else result
+        self._memo[node] = _IN_PROGRESS
+        result = self._memo[node] = self._reduce(node)
+        return result
+
+    def _reduce(self, node):
+        graph = self.graph
+        if node in BASE_UNITS:
+            dimension = [0] * len(BASE_UNITS)
+            dimension[BASE_UNITS.index(node)] = 1
+            return tuple(dimension), 1.0
+
+        types = set(graph.objects(node, RDF.type))
+        if UNIT_POWER in types:
+            base = self.evaluate(graph.value(node, HAS_UNIT_BASE))
+            exponent = int(graph.value(node, HAS_NUMERIC_EXPONENT))
+            if base is None:
+                return None
+            return tuple(d * exponent for d in base[0]), base[1] ** exponent
+        if UNIT_PRODUCT in types:
+            left = self.evaluate(graph.value(node, HAS_LEFT_UNIT_TERM))
+            right = self.evaluate(graph.value(node, HAS_RIGHT_UNIT_TERM))
+            if left is None or right is None:
+                return None
+            return tuple(a + b for a, b in zip(left[0], right[0])), left[1] * right[1]
+        if UNIT_MULTIPLE in types:
+            term = self.evaluate(graph.value(node, HAS_UNIT_TERM))
+            if term is None:
+                return None
+            return term[0], float(graph.value(node, HAS_NUMERIC_FACTOR)) * term[1]
+
+        # A named unit: coherent SI units are exact in base units, other units
+        # are a multiple of an SI unit
+        for prop in (IN_BASE_SI_UNITS, IN_OTHER_SI_UNITS):
+            for term in graph.objects(node, prop):
+                result = self.evaluate(term)
+                if result is not None:
+                    return result
+        conversion_unit = graph.value(node, HAS_CONVERSION_UNIT)
+        conversion_factor = graph.value(node, HAS_CONVERSION_FACTOR)
+        if conversion_unit is not None and conversion_factor is not None:
+            result = self.evaluate(conversion_unit)
+            if result is not None:
+                return result[0], float(conversion_factor) * result[1]
+        # The gram is only described as the unprefixed unit of the kilogram
+        for prefixed in graph.subjects(HAS_NON_PREFIXED_UNIT, node):
+            result = self.evaluate(prefixed)
+            prefix = graph.value(prefixed, HAS_PREFIX)
+            if result is not None and prefix is not None:
+                return result[0], result[1] / float(graph.value(prefix, HAS_SCALING_FACTOR))
+        return None
+
+
+def _multiply(*parts):
+    """Product of Conversions; affine units (°C) cannot be combined."""
+    if len(parts) > 1 and any(part.offset for part in parts):
+        raise ConversionError("Units with an offset (such as °C) cannot be combined with other units")
+    dimension = tuple(map(sum, zip(*(part.dimension for part in parts))))
+    factor = 1.0
+    for part in parts:
+        factor *= part.factor
+    return Conversion(dimension, factor, parts[0].offset if len(parts) == 1 else 0.0)
+
+
+def _power(conversion, exponent):
+    if exponent != 1 and conversion.offset:
+        raise ConversionError("Units with an offset (such as °C) cannot be raised to a power")
+    return Conversion(tuple(d * exponent for d in conversion.dimension), conversion.factor ** exponent,
+                      conversion.offset)
+
+
+# Unit expressions: symbols joined by "*", "·", "." or spaces, divided by
+# "/", grouped with parentheses and raised with "^n" or a trailing integer
+# (superscripts are already digits after NFKC normalization).
+_OPERATOR = re.compile(r"[()*·./^\s\d]")
+_TOKEN = re.compile(r"\s*(?:(?P<op>[()*·./^])|(?P<int>[-+]?\d+)|(?P<sym>[^\s()*·./^\d+-]+))")
+
+
+class _ExpressionParser:
+    """Recursive-descent parser for unit expressions, producing a Conversion."""
+
+    def __init__(self, unit, text):
+        self.unit = unit
+        self.text = text
+        self.tokens = []
+        pos = 0
+        text = text.strip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                raise ConversionError(f"Cannot parse unit expression: {self.text}")
+            self.tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            pos = match.end()
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        result = self._expression()
+        if self.pos != len(self.tokens):
+            raise ConversionError(f"Cannot parse unit expression: {self.text}")
+        return result
+
+    def _expression(self):
+        result = self._term()
+        while True:
+            kind, value = self._peek()
+            if kind is None or (kind, value) == ("op", ")"):
+                return result
+            if kind == "op" and value in "*·.":
+                self._next()
+                result = _multiply(result, self._term())
+            elif kind == "op" and value == "/":
+                self._next()
+                result = _multiply(result, _power(self._term(), -1))
+            else:
+                # Juxtaposition ("N m") is multiplication
+                result = _multiply(result, self._term())
+
+    def _term(self):
+        kind, value = self._next()
+        if (kind, value) == ("op", "("):
+            result = self._expression()
+            if self._next() != ("op", ")"):
+                raise ConversionError(f"Unbalanced parentheses in: {self.text}")
+        elif kind == "sym":
+            result = self.unit(value)
+        else:
+            raise ConversionError(f"Cannot parse unit expression: {self.text}")
+
+        kind, value = self._peek()
+        if (kind, value) == ("op", "^"):
+            self._next()
+            kind, value = self._next()
+            if kind != "int":
+                raise ConversionError(f"Expected an integer exponent in: {self.text}")
+            return _power(result, int(value))
+        if kind == "int":
+            self._next()
+            return _power(result, int(value))
+        return result
+
+
+class ConversionTable:
+    """
+    Every unit the SymbolTable knows, compiled to a Conversion.
+    Units can be looked up by symbol ("km", "kWh") or by name ("kilometre",
+    "degreeCelsius", "degree Celsius").
+    """
+
+    def __init__(self, graph, symbols, dimensions):
+        self.symbols = symbols
+        self.units = {}
+        for entry in symbols.symbols.values():
+            if entry.unit not in self.units:
+                result = dimensions.evaluate(entry.unit)
+                if result is not None:
+                    result = Conversion(*result, OFFSETS.get(entry.unit, 0.0))
+                self.units[entry.unit] = result
+
+        # Compile every symbol, and index the names of every unit
+        self.conversions = {}
+        self.names = {}
+        for key, entry in symbols.symbols.items():
+            conversion = self._scaled(entry)
+            if conversion is None:
+                continue
+            self.conversions[key] = conversion
+            name = (entry.prefix_name or "") + entry.unit_name
+            self.names.setdefault(name.lower(), conversion)
+            if entry.prefix is None:
+                self.names.setdefault(str(entry.unit).split("/")[-1].lower(), conversion)
+                for value in graph.objects(entry.unit, SKOS.prefLabel):
+                    self.names.setdefault(str(value).lower(), conversion)
+
+    def _scaled(self, entry):
+        conversion = self.units.get(entry.unit)
+        if conversion is None:
+            return None
+        if entry.prefix is None:
+            return conversion
+        return Conversion(conversion.dimension, conversion.factor * entry.scaling_factor, conversion.offset)
+
+    def _unit(self, symbol):
+        """Conversion for one unit symbol or name (no operators)."""
+        conversion = self.conversions.get(symbol)
+        if conversion is None:
+            conversion = self.names.get(symbol.lower())
+        if conversion is None:
+            # Compact product of two symbols, e.g. "kWh"
+            factors = self.symbols.split_compact(symbol)
+            if factors:
+                parts = [self._scaled(factor) for factor in factors]
+                if all(part is not None for part in parts):
+                    conversion = _multiply(*parts)
+        if conversion is None:
+            if self.symbols.get(symbol) is not None:
+                raise ConversionError(f"{symbol} is not expressed in SI units and cannot be converted")
+            raise ConversionError(f"Unknown unit: {symbol}")
+        return conversion
+
+    def lookup(self, unit):
+        """
+        Return the Conversion for a unit symbol, name or expression such as
+        "J/K", "m/s^2", "kg·m²" or "J/(kg K)"; raises ConversionError.
+        """
+        text = normalize_symbol(unit)
+        if not _OPERATOR.search(text):
+            return self._unit(text)
+        # Whole names with spaces ("degree Celsius") before parsing
+        conversion = self.names.get(text.lower())
+        if conversion is not None:
+            return conversion
+        return _ExpressionParser(self._unit, text).parse()
+
+    def factors(self, from_unit, to_unit):
+        """
+        Return (scale, shift) such that value_in_to = value_in_from * scale + shift.
+        Raises ConversionError if the units measure different dimensions.
+        """
+        source, target = self.lookup(from_unit), self.lookup(to_unit)
+        if source.dimension != target.dimension:
+            raise ConversionError(f"Cannot convert {from_unit} to {to_unit}: incompatible dimensions")
+        scale = source.factor / target.factor
+        shift = (source.offset - target.offset) / target.factor
+        return scale, shift
+
+    def convert(self, value, from_unit, to_unit):
+        """Convert value from from_unit to to_unit."""
+        scale, shift = self.factors(from_unit, to_unit)
+        return value * scale + shift
+
+    def convert_array(self, values, from_unit, to_unit):
+        """
+        Convert a sequence or array of values in one vectorized operation.
+        Returns a float64 array; the offset of affine units (°C) is applied
+        in the same pass.
+        """
+        scale, shift = self.factors(from_unit, to_unit)
+        result = np.multiply(np.asarray(values, dtype=np.float64), scale)
+        if shift:
+            result += shift
+        return result